@@ -5,6 +5,10 @@ class AbstractHardware:
     @abstractmethod
     def report(self) -> HardwareDTO: ...
 
+    # Cheap to collect summary (OS build, GPU drivers, displays, ...) used to tell whether a cached report is still valid
+    @abstractmethod
+    def fingerprint(self) -> dict[str, object]: ...
+
     @abstractmethod
     def cpu(self) -> list[dict[str, str]]: ...
 
@@ -1,31 +1,78 @@
 from pathlib import Path
 from typing import Self, Optional
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from dto.FileConfigDTO import FileConfigDTO
-from dto.FileHashDTO import FileHashDTO
 from dto.FileLogDTO import FileLogDTO
 from dto.HadwareDTO import HardwareDTO
+from dto.ManifestDiffDTO import ManifestDiffDTO
+from dto.MinidumpSummaryDTO import MinidumpSummaryDTO
 from dto.PowerSettingsDTO import PowerSettingsDTO
 from AbstractHardware import AbstractHardware
+from CollectorRegistry import CollectorRegistry
+from CompressionPlanner import CompressionPlanner
 from Crashdump import Crashdump
+from CrashdumpIndex import CrashdumpIndex
 from Encoder import Encoder
+from FileHashTable import FileHashTable
+from EventArchive import EventArchive
 from Game import Game
-from HardwareWindows import HardwareWindows
-from PowerSettings import PowerSettings
+from HardwareCache import HardwareCache
+from HashCache import HashCache
+from LogWindow import LogWindow
+from Minidump import Minidump
+from ParallelZipWriter import ParallelZipWriter
 from Plutonium import Plutonium
 from PlutoniumFileType import PlutoniumFileType
-from WindowsEventLog import WindowsEventLog
-
-import os, sys, re, zipfile, json, uuid
-import xml.etree.ElementTree as XML
+from ReleaseManifest import ReleaseManifest
+from ReportDelta import ReportDelta
+from ReportVolumes import ReportVolumes
+from StageScheduler import StageScheduler
+from StagingArchive import StagingArchive
+from Tracer import Tracer
+
+import os, sys, io, time, zipfile, uuid, dataclasses
 import datetime as dt
 
 
 class App:
-    def __init__(self, reporter_version: str):
+    HASH_QUEUE_DEPTH = 4
+    CRASHDUMP_PAGE_SIZE = 20
+    XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+
+    def __init__(self, reporter_version: str, started_at: Optional[float] = None):
         self._version = reporter_version
+        self._started_at: float = started_at if started_at is not None else time.perf_counter()
+        self._startup_ms: Optional[float] = None
         self._runtime_alltime_events: bool = "--all-events" in sys.argv
         self._runtime_staging: bool = "--staging" in sys.argv
+        self._runtime_headless: bool = "--headless" in sys.argv
+        self._runtime_root: Optional[str] = App.get_runtime_arg("--root")
+        self._runtime_game: Optional[str] = App.get_runtime_arg("--game")
+        self._runtime_crashdump: str = App.get_runtime_arg("--crashdump", "newest")
+        self._runtime_output_dir: Optional[Path] = Path(App.get_runtime_arg("--output-dir")) if App.get_runtime_arg("--output-dir") else None
+        self._runtime_since: Optional[Path] = Path(App.get_runtime_arg("--since")) if App.get_runtime_arg("--since") else None
+        self._runtime_log_window: Optional[str] = App.get_runtime_arg("--log-window")
+        self._runtime_max_volume_size: Optional[int] = ReportVolumes.parse_size(App.get_runtime_arg("--max-volume-size")) if App.get_runtime_arg("--max-volume-size") else None
+        self._runtime_dump_summary_only: bool = "--dump-summary-only" in sys.argv
+        self._runtime_per_event_files: bool = "--per-event-files" in sys.argv
+        self._runtime_power_subgroups: Optional[list[str]] = App.get_runtime_arg("--power-subgroups").split(",") if App.get_runtime_arg("--power-subgroups") else None
+        self._runtime_hash_cache: bool = "--no-hash-cache" not in sys.argv
+        self._runtime_refresh_hardware: bool = "--refresh-hardware" in sys.argv
+        self._runtime_full_hashes: bool = "--full-hashes" in sys.argv
+        self._runtime_hash_sidecar: bool = "--hash-sidecar" in sys.argv
+        self._runtime_write_manifest: bool = "--write-manifest" in sys.argv
+        self._runtime_compression: str = App.get_runtime_arg("--compression", "balanced")
+        # Checked up front, the planner is only built once every collector has run
+        if self._runtime_compression not in CompressionPlanner.MODES:
+            raise ValueError(f"Unknown compression mode '{self._runtime_compression}', use one of: {', '.join(CompressionPlanner.MODES)}")
+        self._runtime_crashdump_limit: Optional[int] = int(App.get_runtime_arg("--crashdump-limit")) if App.get_runtime_arg("--crashdump-limit") else None
+        self._collectors: CollectorRegistry = CollectorRegistry(App.get_runtime_arg("--collectors"))
+        self._runtime_hash_workers: int = max(1, int(App.get_runtime_arg("--hash-workers", str(min(8, os.cpu_count() or 1)))))
+        self._runtime_zip_workers: int = max(1, int(App.get_runtime_arg("--zip-workers", str(os.cpu_count() or 1))))
 
         self._plutonium: Plutonium = Plutonium()
         self._has_crashdumps: bool = False
@@ -35,14 +82,82 @@ class App:
         self._game: Optional[Game] = None
         self._logs: list[FileLogDTO] = []
         self._crashdumps: Optional[list[Crashdump]] = None
+        self._log_window: Optional[dict] = None
+        self._crashdump_summaries: Optional[list[MinidumpSummaryDTO]] = None
         self._configs: list[FileConfigDTO] = []
-        self._hashes: list[FileHashDTO] = []
-        self._hardware: HardwareDTO
-        self._events: list[XML.Element] = []
+        self._hashes: FileHashTable = FileHashTable()
+        self._hash_cache: Optional[HashCache] = None
+        self._hash_diff: Optional[ManifestDiffDTO] = None
+        self._hardware: Optional[HardwareDTO] = None
+        self._hardware_cache: Optional[HardwareCache] = None
+        self._power_settings: Optional[PowerSettingsDTO] = None
+        self._events: Iterator[str] = iter(())
+        self._stage_errors: dict[str, str] = {}
+        self._report_path: Optional[Path] = None
+        self._report_delta: ReportDelta = ReportDelta()
+        self._report_volumes: Optional[dict] = None
+
+
+    @staticmethod
+    def get_runtime_arg(name: str, default: Optional[str] = None) -> Optional[str]:
+        for i, arg in enumerate(sys.argv):
+            if arg == name and i + 1 < len(sys.argv):
+                return sys.argv[i + 1]
+            if arg.startswith(f"{name}="):
+                return arg[len(name) + 1:]
+        return default
+
+
+    @staticmethod
+    def get_runtime_args(name: str) -> list[str]:
+        """Every value of a flag that can be passed more than once, eg. `--root A --root B`"""
+        values = []
+        for i, arg in enumerate(sys.argv):
+            if arg == name and i + 1 < len(sys.argv):
+                values.append(sys.argv[i + 1])
+            elif arg.startswith(f"{name}="):
+                values.append(arg[len(name) + 1:])
+        return values
+
+
+    def get_report_path(self) -> Optional[Path]:
+        return self._report_path
+
+
+    def get_stage_errors(self) -> dict[str, str]:
+        return self._stage_errors
+
+
+    def build_report(self, sequential: bool = False) -> Self:
+        # Everything except the crashdump/game selection is independent I/O, collected while the user is choosing
+        errors = (StageScheduler(sequential=sequential)
+            .add("logs", self.collect_relevant_logs, interactive=True)
+            .add("configs", self.collect_configs)
+            .add("hashes", self.collect_file_hashes)
+            .add("hardware", self.collect_hardware_data)
+            .add("events", self.collect_event_log_entries, after=["logs"])
+            .add("crashdumps", self.collect_crashdump_summaries, after=["logs"])
+            .add("power", self.collect_power_settings)
+            .run()
+        )
+        if self._game is None:
+            logs_error = errors.get("logs")
+            raise RuntimeError(f"Report was not generated, the logs stage failed ({type(logs_error).__name__}: {logs_error})" if logs_error else "Report was not generated, no game was selected")
+
+        with Tracer.get().span("report", "stage"):
+            self.set_stage_errors(errors).compose_report()
+        return self
+
+
+    def set_stage_errors(self, errors: dict[str, BaseException]) -> Self:
+        self._stage_errors = {name: f"{type(error).__name__}: {error}" for name, error in errors.items()}
+        return self
 
 
     def error_if(self, condition, message: str) -> None:
         if condition:
+            if self._runtime_headless:
+                raise RuntimeError(message)
             input(message)
             sys.exit(0)
 
@@ -50,10 +165,14 @@ class App:
     def set_plutonium_path(self) -> Self:
         print("Finding Plutonium path")
         paths: list[Path] = []
-        if self._runtime_staging:
-            paths.append(Path(os.environ["localappdata"]) / "Plutonium-staging")
-        paths.append(Path.cwd())
-        paths.append(Path(os.environ["localappdata"]) / "Plutonium")
+        if self._runtime_root:
+            # An explicit root is the only candidate, falling back to another install would report the wrong one
+            paths.append(Path(self._runtime_root))
+        else:
+            if self._runtime_staging:
+                paths.append(Path(os.environ["localappdata"]) / "Plutonium-staging")
+            paths.append(Path.cwd())
+            paths.append(Path(os.environ["localappdata"]) / "Plutonium")
 
         for path in paths:
             self._plutonium.set_root(path)
@@ -62,6 +181,8 @@ class App:
             print(f"Plutonium path not found: {self._plutonium.get_root()}")
             continue
 
+        self.error_if(self._runtime_headless and not self._plutonium.is_valid_plutonium_directory(), f"Couldn't find Plutonium files in {self._plutonium.get_root()}")
+
         while not self._plutonium.is_valid_plutonium_directory():
             print("Couldn't find Plutonium files, please enter absolute path to Plutonium folder")
             try_dir = input("> ")
@@ -76,13 +197,16 @@ class App:
 
         print(f"\tSet Plutonium root path to: {self._plutonium.get_root()}")
 
-        self._has_crashdumps = bool(self._plutonium.path_crashdumps().exists() and len(list(self._plutonium.path_crashdumps().iterdir())))
+        self._has_crashdumps = self._plutonium.path_crashdumps().exists() and next(self._plutonium.path_crashdumps().iterdir(), None) is not None
         self._has_t4_logs = bool(self._plutonium.path_main_for(Game.T4).exists() and len(list(self._plutonium.path_main_for(Game.T4).glob("console.log*"))))
         self._has_t5_logs = bool(self._plutonium.path_main_for(Game.T5).exists() and len(list(self._plutonium.path_main_for(Game.T5).glob("console.log*"))))
         self._has_t6_logs = bool(self._plutonium.path_main_for(Game.T6).exists() and len(list(self._plutonium.path_main_for(Game.T6).glob("console_zm.log*"))))
 
         print(f"\tChecked for log presence: crashdumps={self._has_crashdumps} t4={self._has_t4_logs} t5={self._has_t5_logs} t6={self._has_t6_logs}")
 
+        self._startup_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+        print(f"\tReady in {self._startup_ms} ms")
+
         return self
 
 
@@ -101,6 +225,10 @@ class App:
                     self._plutonium.path_crashdumps() / crashdump.get_file(), crashdump.get_file_type()
                 ))
             self._game = self._crashdumps[0].get_game()
+        elif self._runtime_headless:
+            self.error_if(self._runtime_game is None, "No crashdump was selected, pass the game with --game t4|t5|t6")
+            self._game = Game(self._runtime_game.lower())
+            print(f"\tUsing game {self._game.value}")
         else:
             print("\tSelect in which game the problem/crash occured")
             print("\t\t1 - Call of Duty: World at War")
@@ -141,6 +269,71 @@ class App:
         else:
             print(f"\tCollected {len(self._logs)} logs based on selected game")
 
+        if self._runtime_log_window and using_crashdumps:
+            self._window_logs(self._crashdumps[0].get_datetime())
+        elif self._runtime_log_window:
+            print("\tNo crashdump selected, logs are collected in full")
+
+        return self
+
+
+    def _window_logs(self, crashed_at: dt.datetime) -> None:
+        """Narrows console and game logs to `--log-window` minutes around the crash"""
+        before, after = LogWindow.parse(self._runtime_log_window)
+        window = LogWindow(before, after)
+        logs: list[FileLogDTO] = []
+        windows: dict[str, list[int]] = {}
+        skipped: list[str] = []
+
+        with Tracer.get().span("logs.window", "collector") as span:
+            for log in self._logs:
+                if log.type not in (PlutoniumFileType.ConsoleLog, PlutoniumFileType.GameLog):
+                    logs.append(log)
+                    continue
+
+                relative_path = self._plutonium.without_root(log.path)
+                # Rotated logs last written before the window can't hold any of it
+                found = window.find(log.path, crashed_at) if window.covers(log.path, crashed_at) else (0, 0)
+                if found is None:
+                    # No timestamps to narrow it down by
+                    logs.append(log)
+                elif found[0] == found[1]:
+                    skipped.append(relative_path)
+                else:
+                    logs.append(dataclasses.replace(log, start=found[0], end=found[1]))
+                    windows[relative_path] = list(found)
+            span.add(files=len(self._logs))
+
+        self._logs = logs
+        self._log_window = {
+            "crashed_at": crashed_at.isoformat(),
+            "minutes_before": before.total_seconds() / 60,
+            "minutes_after": after.total_seconds() / 60,
+            "windows": windows,
+            "skipped": skipped,
+        }
+        print(f"\tNarrowed {len(windows)} logs to the crash window and skipped {len(skipped)} outside of it ({window.seeks} seeks)")
+
+
+    def collect_crashdump_summaries(self) -> Self:
+        print("Summarizing crashdumps")
+        dumps = [log for log in self._logs if log.type in (PlutoniumFileType.Crashdump, PlutoniumFileType.CrashMinidump)]
+        if not dumps:
+            print("\tNo crashdump selected")
+            return self
+
+        self._crashdump_summaries = []
+        with Tracer.get().span("minidump", "collector") as span:
+            for dump in dumps:
+                try:
+                    self._crashdump_summaries.append(Minidump(dump.path).summary())
+                except (OSError, ValueError) as exc:
+                    print(f"\tCould not read {dump.path.name} ({exc})")
+            span.add(files=len(self._crashdump_summaries))
+
+        for summary in self._crashdump_summaries:
+            exception = f"{summary.exception['code']} in {summary.faulting_module or 'unknown module'}" if summary.exception else "no exception record"
+            print(f"\t{summary.file}: {exception}, {len(summary.threads)} threads, {len(summary.modules)} modules")
         return self
 
 
@@ -163,117 +356,292 @@ class App:
 
     def collect_file_hashes(self) -> Self:
         print("Collecting file hashes")
-        for path in [
-            self._plutonium.path_bin(),
-            self._plutonium.path_games(),
-            self._plutonium.path_launcher(),
-            self._plutonium.path_plugins(),
-            self._plutonium.path_storage(),
-        ]:
-            if not path.exists():
-                continue
+        if self._runtime_hash_cache:
+            self._hash_cache = HashCache(HashCache.default_location(), self._plutonium.get_root()).load()
+
+        # Hashes are resolved in submission order, so the output stays deterministic while
+        # directory enumeration keeps feeding the pool. The window bounds the work queue.
+        pending: deque[tuple[str, os.DirEntry, dict[str, str] | Future]] = deque()
+        max_pending = self._runtime_hash_workers * App.HASH_QUEUE_DEPTH
+
+        # One span for all hashing, a span per file would cost about as much as hashing a small file
+        with Tracer.get().span("hash", "io") as span, ThreadPoolExecutor(max_workers=self._runtime_hash_workers, thread_name_prefix="hash") as pool:
+            for entry in self._iterate_static_files():
+                relative_path = self._plutonium.without_root(Path(entry.path))
+                hashes = self._hash_cache.get(relative_path, entry) if self._hash_cache else None
+                if hashes is None:
+                    hashes = pool.submit(self._plutonium.get_hashes, Path(entry.path))
+                    span.add(files=1, bytes_read=entry.stat().st_size)
+                pending.append((relative_path, entry, hashes))
+
+                if len(pending) >= max_pending:
+                    self._store_hash(*pending.popleft())
+
+            while pending:
+                self._store_hash(*pending.popleft())
+
+        print(f"\tCollected {len(self._hashes)} hashes using {self._runtime_hash_workers} workers")
+        if self._hash_cache:
+            self._hash_cache.save()
+            print(f"\tHash cache: {self._hash_cache.hits} hits, {self._hash_cache.misses} misses, {self._hash_cache.evicted} evicted")
+
+        self._compare_release_manifest()
+        return self
 
-            for file in Plutonium.dir_iterator(path, Plutonium.is_static_file):
-                assert file.is_file(), f"{file} is not a file"
-                self._hashes.append(FileHashDTO(
-                    self._plutonium.without_root(file), self._plutonium.get_hashes(file), file.stat().st_size
-                ))
 
-        print(f"\tCollected {len(self._hashes)} hashes")
+    def _compare_release_manifest(self) -> None:
+        revision = self._plutonium.get_revision()
+        if self._runtime_write_manifest and revision is None:
+            print("\tCan't write a release manifest, revision is missing from info.json")
+        elif self._runtime_write_manifest:
+            print(f"\tWrote release manifest to {ReleaseManifest.write(ReleaseManifest.default_location(revision), revision, self._hashes)}")
 
-        return self
+        manifest_arg = App.get_runtime_arg("--manifest")
+        manifest_path = Path(manifest_arg) if manifest_arg else ReleaseManifest.default_location(revision) if revision is not None else None
+        if manifest_path is None or not manifest_path.exists():
+            print(f"\tNo release manifest for revision {revision}, keeping the full file listing")
+            return
+
+        with ReleaseManifest(manifest_path) as manifest:
+            self._hash_diff = manifest.diff(self._hashes)
+        summary = self._hash_diff.summary
+        print(f"\tCompared against r{self._hash_diff.revision} manifest: {summary['matched']} matched, {summary['missing']} missing, {summary['extra']} extra, {summary['modified']} modified")
 
 
     def collect_hardware_data(self) -> Self:
         print("Collecting hardware info")
-        hw: AbstractHardware = HardwareWindows()
+        if not self._collectors.is_enabled("hardware"):
+            print("\tSkipped, hardware collector is disabled")
+            return self
+        hw: AbstractHardware = self._collectors.get("hardware")()
+        self._hardware_cache = HardwareCache(HardwareCache.default_location()).load()
+        fingerprint = hw.fingerprint()
+        self._hardware = self._hardware_cache.get(fingerprint, self._runtime_refresh_hardware)
+        if self._hardware is not None:
+            print(f"\tReused hardware report from {self._hardware_cache.age_seconds / 3600:.1f} hours ago")
+            return self
+
         self._hardware = hw.report()
-        print("\tCollected hardware report")
+        self._hardware_cache.put(fingerprint, self._hardware)
+        print(f"\tCollected hardware report (cache: {self._hardware_cache.status})")
         return self
 
 
     def collect_event_log_entries(self) -> Self:
         print("Collecting event logs")
-        event_log: WindowsEventLog = WindowsEventLog(
+        if not self._collectors.is_enabled("events"):
+            print("\tSkipped, events collector is disabled")
+            return self
+        event_log = self._collectors.get("events")(
             self._plutonium.get_root(), 
             self._runtime_alltime_events, 
             self._crashdumps[0].get_datetime() if self._crashdumps is not None and len(self._crashdumps) else None
         )
         self._events = event_log.collect()
-        print(f"\tCollected {len(self._events)} events")
+        print(f"\tPrepared event log query, events are streamed into the report")
         return self
 
 
     def collect_power_settings(self) -> Self:
         print("Collecting power settings")
-        self._power_settings: PowerSettingsDTO = PowerSettings().collect()
+        if not self._collectors.is_enabled("power"):
+            print("\tSkipped, power collector is disabled")
+            return self
+        self._power_settings = self._collectors.get("power")(self._runtime_power_subgroups).collect()
         print(f"\tCollected power settings")
         return self
 
 
     def compose_report(self) -> Self:
         print(f"Generating incident report")
-        report_path = Path.cwd() / f"b2-report-{int(dt.datetime.now().timestamp())}.zip"
-
-        with zipfile.ZipFile(report_path, "x", compresslevel=9) as report:
-            report.writestr("general.json", json.dumps({
-                "reporter_version": self._version,
-                "root_path": str(self._plutonium.get_root()),
-                "game": self._game.value,
-                "created_at": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "crashdumps_detected": self._has_crashdumps,
-                "file_hashes": [vars(dto) for dto in self._hashes],
-                "hardware_info": vars(self._hardware),
-                "power_settings": vars(self._power_settings)
-            }, ensure_ascii=False, indent=4, cls=Encoder))
-
+        output_dir = self._runtime_output_dir or Path.cwd()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = output_dir / f"b2-report-{int(dt.datetime.now().timestamp())}.zip"
+        planner = CompressionPlanner(self._runtime_compression)
+        delta = self._report_delta = self._load_report_delta()
+        events = delta.new_events(self._events)
+
+        with ReportVolumes(report_path, self._runtime_max_volume_size, planner.default()) as volumes:
+            report = volumes.get_archive()
             report.mkdir("configs")
-            config_dir = Path("configs")
-            for cfg in self._configs:
-                report.write(cfg.path, config_dir / self._plutonium.without_root(cfg.path))
-
             report.mkdir("logs")
-            logs_dir = Path("logs")
-            for log in self._logs:
-                report.write(log.path, logs_dir / self._plutonium.without_root(log.path))
-
+            with ParallelZipWriter(volumes, self._runtime_zip_workers) as writer:
+                config_dir = Path("configs")
+                for cfg in self._configs:
+                    arcname = config_dir / self._plutonium.without_root(cfg.path)
+                    mode, offset = delta.plan(arcname.as_posix(), cfg.path)
+                    if mode != "unchanged":
+                        writer.write(cfg.path, arcname, planner.plan(cfg.path), offset)
+
+                logs_dir = Path("logs")
+                summarized = {summary.file for summary in self._crashdump_summaries or []} if self._runtime_dump_summary_only else set()
+                for log in self._logs:
+                    arcname = logs_dir / self._plutonium.without_root(log.path)
+                    if log.path.name in summarized:
+                        delta.summarized(arcname.as_posix(), log.path)
+                        continue
+                    if log.end is not None:
+                        delta.window(arcname.as_posix(), log.path, log.start)
+                        writer.write(log.path, arcname, planner.plan(log.path, log.type), log.start, log.end)
+                        continue
+                    mode, offset = delta.plan(arcname.as_posix(), log.path)
+                    if mode != "unchanged":
+                        writer.write(log.path, arcname, planner.plan(log.path, log.type), offset)
+            delta.record(volumes)
+            if summarized:
+                print(f"\tLeft out {len(summarized)} crashdumps, their summaries are in general.json")
+
+            # Capped reports stage the generated members, so they are placed into parts and split like collected files
+            staging = StagingArchive() if volumes.is_capped() else None
+            report = staging or volumes.get_archive()
             report.mkdir("events")
-            events_dir = Path("events")
-            for event in self._events:
-                print(event)
-                assert isinstance(event, XML.Element), f"event is not an instance of Element (found {type(event).__name__})"
-                report.writestr(str(events_dir / f"{uuid.uuid4().hex}.xml"), XML.tostring(event, xml_declaration=True))
-
-        print(f"\tGenerated incident report at {report_path}")
+            if self._runtime_per_event_files:
+                self._write_event_files(report, events)
+            else:
+                print(f"\tWrote {EventArchive(report).write(events)} events to {EventArchive.MEMBER}")
+
+            if self._runtime_hash_sidecar:
+                with Tracer.get().span("zip.hash_sidecar", "io") as span, report.open("file_hashes.bin", "w") as sidecar:
+                    span.add(files=1, bytes_written=self._hashes.write_sidecar(sidecar))
+
+            delta.write(report, self._hashes)
+            self._report_volumes = volumes.describe()
+            # Written last, so timings cover everything else that went into the archive
+            self._write_general(report)
+            if staging is not None:
+                with staging, ParallelZipWriter(volumes, self._runtime_zip_workers) as writer:
+                    for path, arcname in staging.members():
+                        writer.write(path, arcname, planner.default())
+
+        if delta.is_delta():
+            summary = delta.summary()
+            print(f"\tDelta against {self._runtime_since.name}: {summary['full']} new or changed files, {summary['append']} appended, "
+                  f"{summary['unchanged']} unchanged, {summary['removed']} removed, {summary['new_events']} new events")
+        parts = volumes.get_parts()
+        self._report_path = parts[-1]
+        if volumes.is_capped():
+            print(f"\tGenerated incident report in {len(parts)} parts of at most {self._runtime_max_volume_size / 1024 / 1024:.1f} MB, "
+                  f"last part {self._report_path} (compression: {planner.get_mode()})")
+        else:
+            print(f"\tGenerated incident report at {self._report_path} (compression: {planner.get_mode()})")
 
         return self
 
 
+    def _load_report_delta(self) -> ReportDelta:
+        if self._runtime_since is None:
+            return ReportDelta()
+        try:
+            delta = ReportDelta().load(self._runtime_since)
+            print(f"\tBuilding a delta report against {self._runtime_since}")
+            return delta
+        except Exception as exc:
+            print(f"\tCould not read previous report {self._runtime_since}, building a full report ({exc})")
+            return ReportDelta()
+
+
+    def _write_event_files(self, report: zipfile.ZipFile | StagingArchive, events: Iterator[str]) -> None:
+        events_dir = Path("events")
+        with Tracer.get().span("zip.events", "io") as span:
+            for event in events:
+                if not isinstance(event, str):
+                    raise TypeError(f"event is not rendered XML (found {type(event).__name__})")
+                report.writestr(str(events_dir / f"{uuid.uuid4().hex}.xml"), App.XML_DECLARATION + event)
+                span.add(files=1)
+            print(f"\tWrote {span.counters.get('files', 0)} events")
+
+
+    def _write_general(self, report: zipfile.ZipFile | StagingArchive) -> None:
+        hash_delta = self._report_delta.hash_delta(self._hashes)
+        with Tracer.get().span("zip.general", "io") as span:
+            with io.TextIOWrapper(report.open("general.json", "w"), encoding="utf-8") as general:
+                for chunk in Encoder(ensure_ascii=False, indent=4).iterencode_lazy({
+                    "reporter_version": self._version,
+                    "root_path": str(self._plutonium.get_root()),
+                    "game": self._game.value,
+                    "plutonium_revision": self._plutonium.get_revision(),
+                    "created_at": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "crashdumps_detected": self._has_crashdumps,
+                    "log_window": self._log_window,
+                    "volumes": self._report_volumes,
+                    "crashdumps": [vars(summary) for summary in self._crashdump_summaries] if self._crashdump_summaries is not None else None,
+                    # Without a manifest or previous report to compare against, the full listing is all there is
+                    "file_hashes": self._hashes if (self._hash_diff is None and hash_delta is None) or self._runtime_full_hashes else None,
+                    "file_hashes_diff": vars(self._hash_diff) if self._hash_diff else None,
+                    "file_hashes_delta": hash_delta,
+                    "hash_cache": self._hash_cache.stats() if self._hash_cache else None,
+                    "hardware_info": vars(self._hardware) if self._hardware else None,
+                    "hardware_cache": self._hardware_cache.stats() if self._hardware_cache else None,
+                    "power_settings": vars(self._power_settings) if self._power_settings else None,
+                    "startup_ms": self._startup_ms,
+                    "stage_errors": self._stage_errors,
+                    "timings": Tracer.get().timings(),
+                }):
+                    general.write(chunk)
+            span.add(files=1, bytes_written=report.getinfo("general.json").compress_size)
+
+
+    def _iterate_static_files(self) -> Iterator[os.DirEntry]:
+        for path in [
+            self._plutonium.path_bin(),
+            self._plutonium.path_games(),
+            self._plutonium.path_launcher(),
+            self._plutonium.path_plugins(),
+            self._plutonium.path_storage(),
+        ]:
+            if not path.exists():
+                continue
+            yield from Tracer.get().timed_iter(Plutonium.scan_tree(path, Plutonium.is_static_entry, Plutonium.is_excluded_dir), "walk", "io", path=path.name)
+
+
+    def _store_hash(self, relative_path: str, entry: os.DirEntry, result: dict[str, str] | Future) -> None:
+        if isinstance(result, Future):
+            result = result.result()
+            if self._hash_cache:
+                self._hash_cache.put(relative_path, entry, result)
+        self._hashes.append(relative_path, entry.stat().st_size, result)
+
+
+    def _select_crashdump_headless(self, index: CrashdumpIndex, groups: list[str]) -> Optional[list[Crashdump]]:
+        """`--crashdump newest` (default), `--crashdump none` or the common part of a crashdump name"""
+        policy = self._runtime_crashdump
+        if policy == "none" or not groups:
+            print("\tNo crashdump selected")
+            return None
+        selected = groups[0] if policy == "newest" else policy
+        crashdumps = index.crashdumps_for(selected)
+        self.error_if(not crashdumps, f"Crashdump '{selected}' was not found")
+        print(f"\tSelected crashdump {selected}")
+        return crashdumps
+
+
     def _select_crashdump(self) -> Optional[list[Crashdump]]:
-        dump_map: dict[int, Optional[Crashdump]] = {0: None}
-        crashdumps: list[Crashdump] = []
-        dump_games = set()
+        index = CrashdumpIndex(self._plutonium.path_crashdumps()).build()
+        groups = index.groups(0, self._runtime_crashdump_limit)
+        if self._runtime_headless:
+            return self._select_crashdump_headless(index, groups)
 
-        print("\tInput a number representing the game that the crash/issue occured in and then press ENTER. If the game is not on the list, just press ENTER")
-        for dump in self._plutonium.path_crashdumps().iterdir():
-            common_file: Optional[re.Match] = re.search(Crashdump.get_common_exp(), str(dump))
-            if common_file is None:
-                continue
-            crashdumps.append(Crashdump.from_filename(dump.name))
-            common_file = common_file.group(1)
+        pages = max(1, -(-len(groups) // App.CRASHDUMP_PAGE_SIZE))
+        page = 0
 
-            if common_file not in dump_games:
-                print(f"\t\t{len(dump_map)} - {common_file}")
-                dump_map[len(dump_map)] = common_file
-                dump_games.add(common_file)
+        print("\tInput a number representing the game that the crash/issue occured in and then press ENTER. If the game is not on the list, just press ENTER")
+        if len(groups) < len(index):
+            print(f"\tShowing {len(groups)} most recent out of {len(index)} crashdumps")
 
         while True:
-            selection = input("> ")
-            if selection.isnumeric() and dump_map.get(int(selection)):
-                file_opt = dump_map.get(int(selection))
-                if not file_opt:
-                    continue
-                return list(filter(lambda x : x.matches_common(file_opt), crashdumps))
-            if not selection:
-                return None
-            print("Incorrect input. Enter one of the numbers from the list above, or nothing if your game is not on the list")
+            offset = page * App.CRASHDUMP_PAGE_SIZE
+            for i, common_file in enumerate(groups[offset:offset + App.CRASHDUMP_PAGE_SIZE], start=offset + 1):
+                print(f"\t\t{i} - {common_file}")
+            if pages > 1:
+                print(f"\tPage {page + 1}/{pages}, input 'n' for next page or 'p' for previous page")
+
+            while True:
+                selection = input("> ").strip().lower()
+                if selection.isnumeric() and 0 < int(selection) <= len(groups):
+                    return index.crashdumps_for(groups[int(selection) - 1])
+                if not selection:
+                    return None
+                if selection in ("n", "p") and pages > 1:
+                    page = (page + (1 if selection == "n" else -1)) % pages
+                    break
+                print("Incorrect input. Enter one of the numbers from the list above, or nothing if your game is not on the list")
@@ -0,0 +1,135 @@
+from pathlib import Path
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dto.BatchResultDTO import BatchResultDTO
+from App import App
+from Tracer import Tracer
+import os, sys, re, json, time, multiprocessing
+
+
+class BatchRunner:
+    """
+    Builds reports for several Plutonium roots at once, every root headless in its own worker process
+    (fresh interpreter, so caches, collectors and timings don't leak between roots). Each root gets its own
+    directory under the output directory with the report and the console output of its run in `reporter.log`.
+    A summary table of outcomes and stage timings is printed and written to `batch-summary.json`.
+    """
+
+    SUMMARY_STAGES = ("path", "logs", "hashes", "hardware", "events", "report")
+    # Flags that are set per worker and must not be passed through from the batch command line
+    WORKER_FLAGS = ("--root", "--output-dir")
+
+
+    def __init__(self, reporter_version: str, roots: list[str], workers: int, output_dir: Path):
+        self._version = reporter_version
+        self._roots = roots
+        self._workers = max(1, min(workers, len(roots)))
+        self._output_dir = output_dir
+
+
+    def run(self) -> list[BatchResultDTO]:
+        print(f"Building reports for {len(self._roots)} Plutonium roots using {self._workers} worker processes")
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+
+        results: dict[int, BatchResultDTO] = {}
+        # spawn matches Windows everywhere, max_tasks_per_child gives every root a fresh process
+        with ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1) as pool:
+            futures = {
+                pool.submit(BatchRunner.run_root, self._version, root, str(self._root_dir(i, root)), self._worker_argv(root, i)): i
+                for i, root in enumerate(self._roots)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as exc:
+                    # The worker process itself died, eg. killed or out of memory
+                    results[i] = BatchResultDTO(self._roots[i], "failed", f"{type(exc).__name__}: {exc}", 0.0, {}, {}, None)
+                print(f"\t[{done}/{len(self._roots)}] {results[i].root}: {results[i].status} in {results[i].wall_s:.1f}s")
+
+        ordered = [results[i] for i in range(len(self._roots))]
+        self.print_summary(ordered)
+        summary_path = self._output_dir / "batch-summary.json"
+        summary_path.write_text(json.dumps([vars(result) for result in ordered], indent=4), encoding="utf-8")
+        print(f"\tWrote batch summary to {summary_path}")
+        return ordered
+
+
+    def _root_dir(self, i: int, root: str) -> Path:
+        name = re.sub(r"[^\w.-]+", "_", Path(root).name) or "root"
+        return self._output_dir / f"{i + 1:02d}-{name}"
+
+
+    def _worker_argv(self, root: str, i: int) -> list[str]:
+        argv: list[str] = []
+        skip = False
+        for arg in sys.argv:
+            if skip:
+                skip = False
+                continue
+            if arg in BatchRunner.WORKER_FLAGS:
+                skip = True
+                continue
+            if arg.startswith(tuple(f"{flag}=" for flag in BatchRunner.WORKER_FLAGS)):
+                continue
+            argv.append(arg)
+
+        # Worker processes share the cores, unless told otherwise every one gets its slice of them
+        cores = max(1, (os.cpu_count() or 1) // self._workers)
+        if App.get_runtime_arg("--hash-workers") is None:
+            argv += ["--hash-workers", str(min(8, cores))]
+        if App.get_runtime_arg("--zip-workers") is None:
+            argv += ["--zip-workers", str(cores)]
+        if "--headless" not in argv:
+            argv.append("--headless")
+        return argv + ["--root", root, "--output-dir", str(self._root_dir(i, root))]
+
+
+    @staticmethod
+    def run_root(reporter_version: str, root: str, output_dir: str, argv: list[str]) -> BatchResultDTO:
+        started_at = time.perf_counter()
+        sys.argv = argv
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        app: Optional[App] = None
+        status, error = "failed", None
+        stdout = sys.stdout
+        with (Path(output_dir) / "reporter.log").open("w", encoding="utf-8") as log:
+            sys.stdout = log
+            try:
+                with Tracer.get().span("path", "stage"):
+                    app = App(reporter_version, started_at).set_plutonium_path()
+                app.build_report(sequential="--sequential" in argv)
+                status = "partial" if app.get_stage_errors() else "ok"
+            except BaseException as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                print(f"\tReport failed: {error}")
+            finally:
+                sys.stdout = stdout
+
+        report_path = app.get_report_path() if app else None
+        return BatchResultDTO(
+            root=root,
+            status=status,
+            error=error,
+            wall_s=round(time.perf_counter() - started_at, 3),
+            stages_ms={timing["name"]: timing["wall_ms"] for timing in Tracer.get().timings() if timing["category"] == "stage"},
+            stage_errors=app.get_stage_errors() if app else {},
+            report_path=str(report_path) if report_path else None,
+        )
+
+
+    @staticmethod
+    def print_summary(results: list[BatchResultDTO]) -> None:
+        root_width = min(48, max(len("root"), *(len(result.root) for result in results)))
+        header = f"{'root':<{root_width}}  {'status':<8}{'total s':>9}" + "".join(f"{stage:>10}" for stage in BatchRunner.SUMMARY_STAGES) + "  report / error"
+        print(header)
+        print("-" * len(header))
+        for result in results:
+            root = result.root if len(result.root) <= root_width else "..." + result.root[-(root_width - 3):]
+            stages = "".join(
+                f"{result.stages_ms[stage] / 1000:>10.2f}" if stage in result.stages_ms else f"{'-':>10}"
+                for stage in BatchRunner.SUMMARY_STAGES
+            )
+            detail = result.error or (f"{result.report_path} ({', '.join(result.stage_errors)} failed)" if result.stage_errors else result.report_path)
+            print(f"{root:<{root_width}}  {result.status:<8}{result.wall_s:>9.2f}{stages}  {detail}")
@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Optional
+from collections.abc import Iterator
+from contextlib import contextmanager
+import os, time, tempfile
+
+
+class CacheFile:
+    """
+    Cache file shared by every reporter process of a user, several of them write it at once in batch mode.
+    Readers and writers hold a lock file (created exclusively, so it works the same on every platform) and writes go
+    through a uniquely named temporary file that replaces the cache, so a writer can re-read the cache, merge its
+    own changes into it and replace it without another writer's changes getting lost in between.
+    """
+
+    LOCK_TIMEOUT = 10.0
+    # A lock this old was left behind by a writer that was killed
+    STALE_LOCK = 30.0
+    RETRY_DELAY = 0.01
+
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = path.with_name(f"{path.name}.lock")
+
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        deadline = time.monotonic() + CacheFile.LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self._lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - self._lock.stat().st_mtime > CacheFile.STALE_LOCK:
+                        self._lock.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {self._lock}")
+                time.sleep(CacheFile.RETRY_DELAY)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            self._lock.unlink(missing_ok=True)
+
+
+    def read(self) -> Optional[str]:
+        """Cache contents, None when there is no cache yet. Call with the lock held"""
+        try:
+            return self._path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+    def write(self, text: str) -> None:
+        """Replaces the cache. Call with the lock held"""
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self._path.parent, prefix=f"{self._path.stem}-", suffix=".tmp", delete=False) as tmp:
+            tmp.write(text)
+        try:
+            os.replace(tmp.name, self._path)
+        except OSError:
+            Path(tmp.name).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,58 @@
+from typing import Optional
+import importlib
+
+
+class CollectorRegistry:
+    """
+    Collectors registered by name and imported on first use, so heavy platform modules
+    (wmi, COM, win32evtlog) are not loaded before they are actually needed.
+    Selection is a comma separated list of collector names, eg. `hardware,power` enables only those,
+    while names prefixed with `-` are disabled from the full set, eg. `-events`.
+    """
+
+    def __init__(self, selection: Optional[str] = None):
+        self._collectors: dict[str, tuple[str, str]] = {}
+        self._loaded: dict[str, type] = {}
+        self._selection = selection
+        self._enabled: Optional[set[str]] = None
+
+        self.register("hardware", "HardwareWindows", "HardwareWindows")
+        self.register("events", "WindowsEventLog", "WindowsEventLog")
+        self.register("power", "PowerSettings", "PowerSettings")
+
+
+    def register(self, name: str, module: str, attribute: str) -> None:
+        self._collectors[name] = (module, attribute)
+        self._enabled = None
+
+
+    def names(self) -> list[str]:
+        return list(self._collectors)
+
+
+    def is_enabled(self, name: str) -> bool:
+        if self._enabled is None:
+            self._enabled = self._parse_selection()
+        return name in self._enabled
+
+
+    def get(self, name: str) -> type:
+        assert name in self._collectors, f"Unknown collector '{name}'"
+        if name not in self._loaded:
+            module, attribute = self._collectors[name]
+            self._loaded[name] = getattr(importlib.import_module(module), attribute)
+        return self._loaded[name]
+
+
+    def _parse_selection(self) -> set[str]:
+        if not self._selection:
+            return set(self._collectors)
+
+        requested = [name.strip() for name in self._selection.split(",") if name.strip()]
+        for name in requested:
+            assert name.lstrip("+-") in self._collectors, f"Unknown collector '{name.lstrip('+-')}', available: {', '.join(self._collectors)}"
+
+        enabled = {name.lstrip("+") for name in requested if not name.startswith("-")}
+        if not enabled:
+            enabled = set(self._collectors)
+        return enabled - {name[1:] for name in requested if name.startswith("-")}
@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Optional
+from dto.CompressionPlanDTO import CompressionPlanDTO
+from PlutoniumFileType import PlutoniumFileType
+import zipfile, zlib
+
+
+class CompressionPlanner:
+    """
+    Picks compression method and level for every report member, based on the file type
+    and on how well a sample of the file compresses. The mode sets the overall trade-off:
+    - fast: fastest DEFLATE, anything that does not compress well is stored
+    - balanced: default, fast DEFLATE for crashdumps, regular DEFLATE for text
+    - max: strongest compression, uses LZMA (or zstd when available) for large compressible files.
+      Note that archives produced this way may not open with the built-in Windows zip support
+    """
+
+    MODES = ("fast", "balanced", "max")
+    SAMPLE_SIZE = 256 * 1024
+    SMALL_FILE = 64 * 1024
+    LARGE_FILE = 16 * 1024 * 1024
+    INCOMPRESSIBLE_RATIO = 0.9
+    HIGHLY_COMPRESSIBLE_RATIO = 0.5
+    CRASHDUMP_TYPES = (PlutoniumFileType.Crashdump, PlutoniumFileType.CrashMinidump)
+
+
+    def __init__(self, mode: str = "balanced"):
+        if mode not in CompressionPlanner.MODES:
+            raise ValueError(f"Unknown compression mode '{mode}', use one of: {', '.join(CompressionPlanner.MODES)}")
+        self._mode = mode
+
+
+    def get_mode(self) -> str:
+        return self._mode
+
+
+    def default(self) -> CompressionPlanDTO:
+        """Plan used for small generated members, like general.json or event entries"""
+        return CompressionPlanDTO(zipfile.ZIP_DEFLATED, {"fast": 1, "balanced": 6, "max": 9}[self._mode])
+
+
+    def plan(self, path: Path, file_type: Optional[PlutoniumFileType] = None) -> CompressionPlanDTO:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return self.default()
+
+        if size <= CompressionPlanner.SMALL_FILE:
+            return self.default()
+
+        ratio = CompressionPlanner._sample_ratio(path, size)
+        if ratio >= CompressionPlanner.INCOMPRESSIBLE_RATIO:
+            return CompressionPlanDTO(zipfile.ZIP_STORED, None, ratio)
+
+        if self._mode == "fast":
+            return CompressionPlanDTO(zipfile.ZIP_DEFLATED, 1, ratio)
+
+        if self._mode == "balanced":
+            if file_type in CompressionPlanner.CRASHDUMP_TYPES or size >= CompressionPlanner.LARGE_FILE:
+                return CompressionPlanDTO(zipfile.ZIP_DEFLATED, 1, ratio)
+            return CompressionPlanDTO(zipfile.ZIP_DEFLATED, 6, ratio)
+
+        if size >= CompressionPlanner.LARGE_FILE and ratio <= CompressionPlanner.HIGHLY_COMPRESSIBLE_RATIO:
+            zstd = getattr(zipfile, "ZIP_ZSTANDARD", None)
+            if zstd is not None:
+                return CompressionPlanDTO(zstd, 9, ratio)
+            return CompressionPlanDTO(zipfile.ZIP_LZMA, None, ratio)
+        return CompressionPlanDTO(zipfile.ZIP_DEFLATED, 9, ratio)
+
+
+    @staticmethod
+    def _sample_ratio(path: Path, size: int) -> float:
+        # Sample the beginning and the middle of the file, dump headers alone are not representative
+        half = CompressionPlanner.SAMPLE_SIZE // 2
+        try:
+            with path.open("rb") as fh:
+                sample = fh.read(half)
+                fh.seek(max(size // 2, len(sample)))
+                sample += fh.read(half)
+        except OSError:
+            return 0.0
+
+        if not sample:
+            return 0.0
+        return len(zlib.compress(sample, 1)) / len(sample)
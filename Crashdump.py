@@ -56,6 +56,10 @@ class Crashdump:
         return self._file_type
 
 
+    def get_revision(self) -> str:
+        return self._revision
+
+
     def get_game(self) -> Game:
         return self._game
 
@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Self
+from Crashdump import Crashdump
+import os
+
+
+class CrashdumpIndex:
+    """
+    Single pass index of the crashdumps directory. Files are grouped by their common
+    `plutonium-rNNNN-tXX-date` prefix, `Crashdump` objects are only created for a selected group.
+    """
+
+    COMMON_EXP = Crashdump.get_common_exp()
+
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._groups: dict[str, list[str]] = {}
+        self._order: list[str] = []
+
+
+    def build(self) -> Self:
+        self._groups = {}
+        try:
+            with os.scandir(self._path) as it:
+                for entry in it:
+                    common = CrashdumpIndex.COMMON_EXP.search(entry.name)
+                    if common is None:
+                        continue
+                    self._groups.setdefault(common.group(1), []).append(entry.name)
+        except OSError:
+            pass
+
+        # Prefix ends with a fixed width YYYY-MM-DD_HH-MM-SS timestamp, which sorts chronologically as a string
+        self._order = sorted(self._groups, key=lambda common: (common[-19:], common), reverse=True)
+        return self
+
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+    def groups(self, offset: int = 0, limit: int | None = None) -> list[str]:
+        return self._order[offset:None if limit is None else offset + limit]
+
+
+    def crashdumps_for(self, common: str) -> list[Crashdump]:
+        return [Crashdump.from_filename(name) for name in sorted(self._groups.get(common, []))]
@@ -1,8 +1,60 @@
 import json
 from pathlib import Path
+from collections.abc import Iterator
 
 class Encoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, Path):
             return str(o)
         return super().default(o)
+
+    def iterencode_lazy(self, document: dict) -> Iterator[str]:
+        """
+        Encode a top level object chunk by chunk. Values that are iterators (eg. generators) are consumed
+        and emitted one item at a time, so large sections never have to be materialized as a list.
+        Values with an `iterencode_rows(encoder)` method (eg. `FileHashTable`) encode their own items, each one
+        formatted as a top level value with this encoder's settings.
+        The output is identical to `json.dumps` with the same encoder settings.
+        """
+        if not document:
+            yield "{}"
+            return
+
+        indent = self._indent_str()
+        newline = "\n" + indent if self.indent is not None else ""
+        item_separator, key_separator = self.item_separator, self.key_separator
+        if self.indent is not None:
+            item_separator = item_separator.rstrip()
+
+        yield "{"
+        for i, (key, value) in enumerate(document.items()):
+            if i:
+                yield item_separator
+            yield newline + json.dumps(str(key), ensure_ascii=self.ensure_ascii) + key_separator
+
+            iterencode_rows = getattr(value, "iterencode_rows", None)
+            if not isinstance(value, Iterator) and iterencode_rows is None:
+                yield from self._reindent(self.iterencode(value), newline)
+                continue
+
+            empty = True
+            for item in (iterencode_rows(self) if iterencode_rows else value):
+                yield ("[" if empty else item_separator) + newline + indent
+                if iterencode_rows:
+                    yield item.replace("\n", newline + indent)
+                else:
+                    yield from self._reindent(self.iterencode(item), newline + indent)
+                empty = False
+            yield "[]" if empty else newline + "]"
+
+        yield ("\n" if self.indent is not None else "") + "}"
+
+    def _indent_str(self) -> str:
+        if self.indent is None:
+            return ""
+        return " " * self.indent if isinstance(self.indent, int) else self.indent
+
+    @staticmethod
+    def _reindent(chunks: Iterator[str], newline: str) -> Iterator[str]:
+        for chunk in chunks:
+            yield chunk.replace("\n", newline)
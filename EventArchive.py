@@ -0,0 +1,76 @@
+from typing import Optional
+from collections.abc import Iterable
+from dto.EventIndexDTO import EventIndexDTO
+from Tracer import Tracer
+import re, json, zipfile
+
+
+class EventArchive:
+    """
+    Writes all events into a single `events/events.xml` member, one rendered event per line inside an `<Events>` root,
+    and an `events/index.json` with event id, record id, time, provider and the byte offset and length of every event
+    within the uncompressed stream. The member is compressed like the rest of the report, so seeking to an offset
+    still decompresses everything before it, the offsets only save support tooling from parsing the XML to find
+    the bytes of a single event.
+    """
+
+    MEMBER = "events/events.xml"
+    INDEX = "events/index.json"
+    HEADER = b"<?xml version='1.0' encoding='utf-8'?>\n<Events>\n"
+    FOOTER = b"</Events>\n"
+
+    EVENT_ID = re.compile(r"<EventID[^>]*>(\d+)</EventID>")
+    RECORD_ID = re.compile(r"<EventRecordID>(\d+)</EventRecordID>")
+    TIME_CREATED = re.compile(r"<TimeCreated SystemTime=['\"]([^'\"]+)['\"]")
+    PROVIDER = re.compile(r"<Provider Name=['\"]([^'\"]+)['\"]")
+
+
+    def __init__(self, report: zipfile.ZipFile):
+        self._report = report
+        self._index: list[EventIndexDTO] = []
+
+
+    def write(self, events: Iterable[str]) -> int:
+        with Tracer.get().span("zip.events", "io") as span:
+            with self._report.open(EventArchive.MEMBER, "w", force_zip64=True) as stream:
+                stream.write(EventArchive.HEADER)
+                offset = len(EventArchive.HEADER)
+                for event in events:
+                    if not isinstance(event, str):
+                        raise TypeError(f"event is not rendered XML (found {type(event).__name__})")
+                    # Rendered events are single line, line breaks inside one would only break the line-per-event convenience
+                    data = event.strip().encode("utf-8")
+                    stream.write(data + b"\n")
+                    self._index.append(EventArchive.describe(event, offset, len(data)))
+                    offset += len(data) + 1
+                stream.write(EventArchive.FOOTER)
+
+            self._report.writestr(EventArchive.INDEX, json.dumps({
+                "member": EventArchive.MEMBER,
+                "count": len(self._index),
+                "events": [vars(entry) for entry in self._index],
+            }, indent=4))
+            span.add(files=len(self._index), bytes_written=self._report.getinfo(EventArchive.MEMBER).compress_size)
+        return len(self._index)
+
+
+    @staticmethod
+    def describe(event: str, offset: int, length: int) -> EventIndexDTO:
+        return EventIndexDTO(
+            event_id=EventArchive._int(EventArchive.EVENT_ID.search(event)),
+            record_id=EventArchive._int(EventArchive.RECORD_ID.search(event)),
+            time_created=EventArchive._str(EventArchive.TIME_CREATED.search(event)),
+            provider=EventArchive._str(EventArchive.PROVIDER.search(event)),
+            offset=offset,
+            length=length,
+        )
+
+
+    @staticmethod
+    def _int(match: Optional[re.Match]) -> Optional[int]:
+        return int(match.group(1)) if match else None
+
+
+    @staticmethod
+    def _str(match: Optional[re.Match]) -> Optional[str]:
+        return match.group(1) if match else None
@@ -0,0 +1,120 @@
+from typing import BinaryIO
+from collections.abc import Iterator
+from array import array
+from dto.FileHashDTO import FileHashDTO
+import json, struct
+
+
+class FileHashTable:
+    """
+    Collected file hashes stored column by column: paths, sizes, CRC32s and raw SHA-1/SHA-256 digests in flat buffers,
+    instead of a `FileHashDTO` with a dict of hex strings per file. Rows are only materialized as `FileHashDTO`
+    when iterated, `iterencode_rows` writes the general.json listing straight from the columns.
+    """
+
+    SHA1_SIZE = 20
+    SHA256_SIZE = 32
+    SIDECAR_MAGIC = b"B2FH"
+    SIDECAR_VERSION = 1
+    SIDECAR_HEADER = struct.Struct("<4sII")
+    SIDECAR_ROW = struct.Struct("<HqI20s32s")
+
+
+    def __init__(self):
+        self._paths: list[str] = []
+        self._sizes = array("q")
+        self._crc32 = array("L")
+        self._sha1 = bytearray()
+        self._sha256 = bytearray()
+
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+    def __iter__(self) -> Iterator[FileHashDTO]:
+        for i in range(len(self._paths)):
+            yield self.row(i)
+
+
+    def append(self, path: str, size: int, hashes: dict[str, str]) -> None:
+        sha1 = bytes.fromhex(hashes["sha1"])
+        sha256 = bytes.fromhex(hashes["sha256"])
+        assert len(sha1) == FileHashTable.SHA1_SIZE and len(sha256) == FileHashTable.SHA256_SIZE, f"Unexpected digest size for {path}"
+        self._crc32.append(int(hashes["crc32"], 16))
+        self._sha1 += sha1
+        self._sha256 += sha256
+        self._sizes.append(size)
+        self._paths.append(path)
+
+
+    def row(self, i: int) -> FileHashDTO:
+        return FileHashDTO(self._paths[i], self.hashes(i), self._sizes[i])
+
+
+    def hashes(self, i: int) -> dict[str, str]:
+        return {
+            "crc32": "0x" + format(self._crc32[i], "08X"),
+            "sha1": self._sha1[i * FileHashTable.SHA1_SIZE:(i + 1) * FileHashTable.SHA1_SIZE].hex(),
+            "sha256": self._sha256[i * FileHashTable.SHA256_SIZE:(i + 1) * FileHashTable.SHA256_SIZE].hex(),
+        }
+
+
+    def checksums(self) -> Iterator[tuple[str, int, int]]:
+        """Path, size and CRC-32 of every row, enough to tell whether a file changed"""
+        return zip(self._paths, self._sizes, self._crc32)
+
+
+    def iterencode_rows(self, encoder: json.JSONEncoder) -> Iterator[str]:
+        """Every row as it would be encoded from `vars(FileHashDTO)` by `encoder`, without building the dicts"""
+        if encoder.indent is None:
+            newline, indent = "", ""
+            item_separator = encoder.item_separator
+        else:
+            newline = "\n"
+            indent = " " * encoder.indent if isinstance(encoder.indent, int) else encoder.indent
+            item_separator = encoder.item_separator.rstrip()
+        key_separator = encoder.key_separator
+        encode_string = json.encoder.encode_basestring_ascii if encoder.ensure_ascii else json.encoder.encode_basestring
+
+        first, second = newline + indent, newline + indent * 2
+        template = (
+            f"{{{first}\"path\"{key_separator}%s{item_separator}"
+            f"{first}\"hashes\"{key_separator}{{"
+            f"{second}\"crc32\"{key_separator}\"0x%08X\"{item_separator}"
+            f"{second}\"sha1\"{key_separator}\"%s\"{item_separator}"
+            f"{second}\"sha256\"{key_separator}\"%s\""
+            f"{first}}}{item_separator}"
+            f"{first}\"size\"{key_separator}%d{newline}}}"
+        )
+
+        sha1, sha256 = memoryview(self._sha1), memoryview(self._sha256)
+        sha1_size, sha256_size = FileHashTable.SHA1_SIZE, FileHashTable.SHA256_SIZE
+        for i, path in enumerate(self._paths):
+            yield template % (
+                encode_string(path),
+                self._crc32[i],
+                sha1[i * sha1_size:(i + 1) * sha1_size].hex(),
+                sha256[i * sha256_size:(i + 1) * sha256_size].hex(),
+                self._sizes[i],
+            )
+
+
+    def write_sidecar(self, fh: BinaryIO) -> int:
+        """
+        Compact binary listing: header (magic, version, row count), then per row the UTF-8 path length,
+        size, CRC32, SHA-1 and SHA-256, followed by the path. Little endian, see `SIDECAR_ROW`.
+        """
+        written = fh.write(FileHashTable.SIDECAR_HEADER.pack(FileHashTable.SIDECAR_MAGIC, FileHashTable.SIDECAR_VERSION, len(self._paths)))
+        sha1_size, sha256_size = FileHashTable.SHA1_SIZE, FileHashTable.SHA256_SIZE
+        for i, path in enumerate(self._paths):
+            encoded = path.encode("utf-8")
+            written += fh.write(FileHashTable.SIDECAR_ROW.pack(
+                len(encoded),
+                self._sizes[i],
+                self._crc32[i],
+                bytes(self._sha1[i * sha1_size:(i + 1) * sha1_size]),
+                bytes(self._sha256[i * sha256_size:(i + 1) * sha256_size]),
+            ))
+            written += fh.write(encoded)
+        return written
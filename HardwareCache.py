@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Self, Optional
+from dto.HadwareDTO import HardwareDTO
+from CacheFile import CacheFile
+import os, json, time
+
+
+class HardwareCache:
+    """
+    Persisted hardware report, so the WMI queries only run when the machine changed.
+    The snapshot is reused while it is younger than `TTL` seconds and the fingerprint it was taken with
+    (OS build, GPU drivers, displays, ...) still matches the current one.
+    """
+
+    VERSION = 1
+    TTL = 7 * 24 * 60 * 60
+
+
+    def __init__(self, cache_file: Path, ttl: int = TTL):
+        self._cache_file = cache_file
+        self._file = CacheFile(cache_file)
+        self._ttl = ttl
+        self._snapshot: Optional[dict] = None
+        self.status: str = "miss"
+        self.age_seconds: Optional[float] = None
+
+
+    @staticmethod
+    def default_location() -> Path:
+        base = os.environ.get("localappdata")
+        return (Path(base) if base else Path.home() / ".cache") / "B2-Plutonium-Reporter" / "hardware-cache.json"
+
+
+    def load(self) -> Self:
+        try:
+            with self._file.locked():
+                text = self._file.read()
+            data = json.loads(text) if text is not None else {}
+            if data.get("version") == HardwareCache.VERSION:
+                self._snapshot = data
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            print(f"\tHardware cache is unreadable, collecting from scratch ({exc})")
+        return self
+
+
+    def get(self, fingerprint: dict[str, object], refresh: bool = False) -> Optional[HardwareDTO]:
+        if refresh:
+            self.status = "refresh"
+            return None
+        if self._snapshot is None:
+            self.status = "miss"
+            return None
+
+        self.age_seconds = round(time.time() - self._snapshot["created_at"], 1)
+        if self.age_seconds > self._ttl or self.age_seconds < 0:
+            self.status = "expired"
+            return None
+        # Round trip through json, so tuples and other non-json types compare the same way they were stored
+        if self._snapshot["fingerprint"] != json.loads(json.dumps(fingerprint, default=str)):
+            self.status = "changed"
+            return None
+
+        self.status = "hit"
+        return HardwareDTO(**self._snapshot["hardware"])
+
+
+    def put(self, fingerprint: dict[str, object], hardware: HardwareDTO) -> Self:
+        self._snapshot = {
+            "version": HardwareCache.VERSION,
+            "created_at": time.time(),
+            "fingerprint": fingerprint,
+            "hardware": vars(hardware),
+        }
+        self.age_seconds = 0.0
+
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # The snapshot is of this machine, whichever process of a batch writes it last holds the same one
+            with self._file.locked():
+                self._file.write(json.dumps(self._snapshot, default=str))
+        except OSError as exc:
+            print(f"\tCould not save hardware cache ({exc})")
+        return self
+
+
+    def stats(self) -> dict[str, object]:
+        return {"status": self.status, "age_seconds": self.age_seconds}
@@ -1,86 +1,97 @@
-import wmi, ctypes
+import wmi, ctypes, pythoncom, winreg, platform
 from ctypes import wintypes
-from AbstractHardware import AbstractHardware
-from dto.HadwareDTO import HardwareDTO
+from typing import Optional
+from WmiHardware import WmiHardware
+from Tracer import Tracer
 
 
-class HardwareWindows(AbstractHardware):
-    def __init__(self):
-        self._wmi = wmi.WMI()
+class HardwareWindows(WmiHardware):
+    DISPLAY_ADAPTER_CLASS = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e968-e325-11ce-bfc1-08002be10318}"
+    CPU_KEY = r"HARDWARE\DESCRIPTION\System\CentralProcessor\0"
 
 
-    def report(self) -> HardwareDTO:
-        return HardwareDTO(self.cpu(), self.gpu(), self.ram(), self.os(), self.display())
+    def _connect(self) -> "wmi._wmi_namespace":
+        return wmi.WMI()
 
 
-    def cpu(self) -> list[dict[str, str]]:
-        try:
-            return [
-                {
-                    "name": cpu.Name,
-                    "cores": cpu.NumberOfCores,
-                    "logical_processors": cpu.NumberOfLogicalProcessors,
-                    "max_clock_mhz": cpu.MaxClockSpeed,
-                    "manufacturer": cpu.Manufacturer,
-                }
-            for cpu in self._wmi.Win32_Processor()]
-        except Exception as exc:
-            print(f"Could not collect hardware data [CPU] with error {exc}")
-            return []
+    # COM has to be initialized on every thread using it, each probe runs on its own thread
+    def _initialize_thread(self) -> None:
+        pythoncom.CoInitialize()
 
 
-    def gpu(self) -> list[dict[str, object]]:
-        try:
-            gpus = []
+    def _uninitialize_thread(self) -> None:
+        super()._uninitialize_thread()
+        pythoncom.CoUninitialize()
 
-            for gpu in self._wmi.Win32_VideoController():
-                vram = None
-                if gpu.AdapterRAM is not None:
-                    vram = gpu.AdapterRAM & 0xFFFFFFFF
 
-                gpus.append({
-                    "name": gpu.Name,
-                    "driver_version": gpu.DriverVersion,
-                    "video_ram_bytes": vram,
-                    "video_processor": gpu.VideoProcessor,
-                    "pnp_device_id": gpu.PNPDeviceID,
-                })
+    def fingerprint(self) -> dict[str, object]:
+        with Tracer.get().span("hardware.fingerprint", "collector"):
+            return {
+                "os_build": platform.version(),
+                "cpu": HardwareWindows._registry_value(winreg.HKEY_LOCAL_MACHINE, HardwareWindows.CPU_KEY, "ProcessorNameString"),
+                "memory_bytes": HardwareWindows._total_memory(),
+                "gpu_drivers": HardwareWindows._gpu_drivers(),
+                "displays": [[monitor["device_string"], monitor["width"], monitor["height"], monitor["refresh_rate"]] for monitor in self.display()],
+            }
 
-            return gpus
 
-        except Exception as exc:
-            print(f"Could not collect hardware data [GPU] with error {exc}")
-            return []
+    @staticmethod
+    def _registry_value(root: int, key: str, name: str) -> Optional[str]:
+        try:
+            with winreg.OpenKey(root, key) as handle:
+                return str(winreg.QueryValueEx(handle, name)[0])
+        except OSError:
+            return None
 
 
-    def ram(self) -> list[dict[str, str]]:
+    @staticmethod
+    def _gpu_drivers() -> list[list[Optional[str]]]:
+        drivers = []
         try:
-            return [
-                {
-                    "capacity_bytes": mem.Capacity,
-                    "speed_mhz": mem.Speed,
-                    "manufacturer": mem.Manufacturer,
-                    "part_number": mem.PartNumber.strip(),
-                }
-                for mem in self._wmi.Win32_PhysicalMemory()
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, HardwareWindows.DISPLAY_ADAPTER_CLASS) as adapters:
+                i = 0
+                while True:
+                    try:
+                        subkey = winreg.EnumKey(adapters, i)
+                    except OSError:
+                        break
+                    i += 1
+                    # Adapters are numbered 0000, 0001, ..., other subkeys (eg. Properties) are not readable
+                    if not subkey.isdigit():
+                        continue
+                    key = f"{HardwareWindows.DISPLAY_ADAPTER_CLASS}\\{subkey}"
+                    drivers.append([
+                        HardwareWindows._registry_value(winreg.HKEY_LOCAL_MACHINE, key, "DriverDesc"),
+                        HardwareWindows._registry_value(winreg.HKEY_LOCAL_MACHINE, key, "DriverVersion"),
+                    ])
+        except OSError:
+            pass
+        return drivers
+
+
+    @staticmethod
+    def _total_memory() -> Optional[int]:
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", wintypes.DWORD),
+                ("dwMemoryLoad", wintypes.DWORD),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
             ]
-        except Exception as exc:
-            print(f"Could not collect hardware data [RAM] with error {exc}")
-            return []
-
 
-    def os(self) -> dict[str, str]:
         try:
-            sys = self._wmi.Win32_OperatingSystem()[0]
-            return {
-                "name": sys.Caption,
-                "version": sys.Version,
-                "build_number": sys.BuildNumber,
-                "architecture": sys.OSArchitecture,
-            }
-        except Exception as exc:
-            print(f"Could not collect hardware data [OS] with error {exc}")
-            return {}
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(status)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullTotalPhys
+        except Exception:
+            pass
+        return None
 
 
     def display(self) -> list[dict[str, str]]:
@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Self, Optional
+from CacheFile import CacheFile
+import os, json
+
+
+class HashCache:
+    """
+    Persistent cache of file hashes, so files that did not change between reports are not hashed again.
+    Entries are keyed by path relative to Plutonium root and validated against size, mtime_ns and inode.
+    Every root is saved by merging it into the cache as it is on disk then, so reports of several roots built
+    at once (batch mode) keep each other's entries.
+    """
+
+    VERSION = 1
+    MAX_UNSEEN_RUNS = 5
+
+
+    def __init__(self, cache_file: Path, root: Path):
+        self._cache_file = cache_file
+        self._file = CacheFile(cache_file)
+        self._root = str(root)
+        self._run: int = 0
+        self._entries: dict[str, dict] = {}
+        self._roots: dict[str, dict] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evicted: int = 0
+
+
+    @staticmethod
+    def default_location() -> Path:
+        base = os.environ.get("localappdata")
+        return (Path(base) if base else Path.home() / ".cache") / "B2-Plutonium-Reporter" / "hash-cache.json"
+
+
+    def load(self) -> Self:
+        try:
+            with self._file.locked():
+                self._roots = HashCache._parse(self._file.read())
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            print(f"\tHash cache is unreadable, starting from scratch ({exc})")
+
+        cached_root = self._roots.get(self._root, {})
+        self._run = cached_root.get("run", 0) + 1
+        self._entries = cached_root.get("files", {})
+        return self
+
+
+    def get(self, relative_path: str, file: os.DirEntry) -> Optional[dict[str, str]]:
+        entry = self._entries.get(relative_path)
+        if entry is not None and entry["key"] == HashCache._key(file):
+            entry["seen"] = self._run
+            self.hits += 1
+            return entry["hashes"]
+        self.misses += 1
+        return None
+
+
+    def put(self, relative_path: str, file: os.DirEntry, hashes: dict[str, str]) -> None:
+        self._entries[relative_path] = {
+            "key": HashCache._key(file),
+            "hashes": hashes,
+            "seen": self._run,
+        }
+
+
+    def save(self) -> Self:
+        root = Path(self._root)
+        for relative_path, entry in list(self._entries.items()):
+            if entry["seen"] == self._run:
+                continue
+            if self._run - entry["seen"] >= HashCache.MAX_UNSEEN_RUNS or not (root / relative_path).exists():
+                del self._entries[relative_path]
+                self.evicted += 1
+
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._file.locked():
+                # Other roots are taken as they are now, another process may have saved its root since this one loaded
+                try:
+                    roots = HashCache._parse(self._file.read())
+                except (ValueError, KeyError):
+                    roots = {}
+                roots[self._root] = {"run": self._run, "files": self._entries}
+                self._file.write(json.dumps({"version": HashCache.VERSION, "roots": roots}, separators=(",", ":")))
+            self._roots = roots
+        except OSError as exc:
+            print(f"\tCould not save hash cache ({exc})")
+        return self
+
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+
+    @staticmethod
+    def _parse(text: Optional[str]) -> dict[str, dict]:
+        """Roots of a saved cache, none for a missing cache or one of another version"""
+        if text is None:
+            return {}
+        data = json.loads(text)
+        return data["roots"] if data.get("version") == HashCache.VERSION else {}
+
+
+    @staticmethod
+    def _key(file: os.DirEntry) -> list[int]:
+        # DirEntry.inode() is used over st_ino, as the stat cached by scandir on Windows does not carry it
+        stat = file.stat()
+        return [stat.st_size, stat.st_mtime_ns, file.inode()]
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import BinaryIO, Optional
+import re, datetime as dt
+
+
+class LogWindow:
+    """
+    Finds the part of a timestamped log around a point in time (eg. a crash) without reading the whole log.
+
+    Lines are expected in time order and start with `[YYYY-MM-DD HH:MM:SS]`, lines without a timestamp belong to the line
+    before them. The window is found by bisecting byte offsets: every probe seeks, skips to the next line start and reads
+    forward to the first timestamped line, so a log costs O(log n) seeks and short reads. Timestamps are compared
+    as bytes, the format sorts the same way as the times it holds.
+    """
+
+    TIMESTAMP = re.compile(rb"\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+    def __init__(self, before: dt.timedelta, after: dt.timedelta):
+        self._before = before
+        self._after = after
+        self.seeks: int = 0
+
+
+    @staticmethod
+    def parse(spec: str) -> tuple[dt.timedelta, dt.timedelta]:
+        """`--log-window` value, minutes before and after the crash, `30` is shorthand for `30,30`"""
+        before, _, after = spec.partition(",")
+        return dt.timedelta(minutes=float(before)), dt.timedelta(minutes=float(after or before))
+
+
+    def covers(self, path: Path, moment: dt.datetime) -> bool:
+        """Whether the log was still written to when the window starts, rotated logs last written before can be skipped"""
+        return dt.datetime.fromtimestamp(path.stat().st_mtime) >= moment - self._before
+
+
+    def find(self, path: Path, moment: dt.datetime) -> Optional[tuple[int, int]]:
+        """Byte range of the lines within the window, None when the log has no timestamped lines to bisect"""
+        start_key = (moment - self._before).strftime(LogWindow.TIME_FORMAT).encode()
+        # Lines are stamped to the second, the window ends with the first line of the second after it
+        end_key = (moment + self._after + dt.timedelta(seconds=1)).strftime(LogWindow.TIME_FORMAT).encode()
+
+        with path.open("rb") as fh:
+            size = fh.seek(0, 2)
+            if self._probe(fh, 0) is None:
+                return None
+            start = self._lower_bound(fh, size, start_key)
+            end = self._lower_bound(fh, size, end_key)
+        return start, max(start, end)
+
+
+    def _lower_bound(self, fh: BinaryIO, size: int, key: bytes) -> int:
+        """Offset of the first timestamped line at or after `key`, `size` if there is none"""
+        lo, hi, found = 0, size, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._probe(fh, mid)
+            if probe is not None and probe[1] < key:
+                lo = probe[0] + 1
+                continue
+            # Every line from mid up to the probed one has no timestamp, so the bound is there or before mid
+            if probe is not None:
+                found = min(found, probe[0])
+            hi = mid
+        return found
+
+
+    def _probe(self, fh: BinaryIO, offset: int) -> Optional[tuple[int, bytes]]:
+        """First timestamped line starting at or after `offset`, as its offset and timestamp"""
+        self.seeks += 1
+        if offset == 0:
+            fh.seek(0)
+        else:
+            fh.seek(offset - 1)
+            fh.readline()
+        position = fh.tell()
+        for line in iter(fh.readline, b""):
+            match = LogWindow.TIMESTAMP.match(line)
+            if match:
+                return position, match.group(1) + b" " + match.group(2)
+            position += len(line)
+        return None
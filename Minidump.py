@@ -0,0 +1,158 @@
+from pathlib import Path
+from typing import Optional
+from dto.MinidumpSummaryDTO import MinidumpSummaryDTO
+import mmap, ntpath, struct, datetime as dt
+
+
+class Minidump:
+    """
+    Summary of a Windows minidump (exception, threads, loaded modules) read in place from a memory map.
+    Only the header, the stream directory and the streams it points to are touched, structures are unpacked
+    straight from the mapping, so a multi-hundred-MB full dump costs a handful of pages.
+    """
+
+    SIGNATURE = b"MDMP"
+    HEADER = struct.Struct("<4sIIIIIQ")
+    COUNT = struct.Struct("<I")
+    VERSION = struct.Struct("<II")
+    DIRECTORY_ENTRY = struct.Struct("<III")
+    THREAD = struct.Struct("<IIIIQQIIII")
+    MODULE = struct.Struct("<QIIII")
+    MODULE_SIZE = 108
+    MODULE_VERSION_OFFSET = 24 + 8
+    EXCEPTION = struct.Struct("<IIIIQQI")
+    SYSTEM_INFO = struct.Struct("<HHHBBIIII")
+
+    THREAD_LIST_STREAM = 3
+    MODULE_LIST_STREAM = 4
+    EXCEPTION_STREAM = 6
+    SYSTEM_INFO_STREAM = 7
+
+    EXCEPTION_NAMES = {
+        0x80000003: "BREAKPOINT",
+        0xC0000005: "ACCESS_VIOLATION",
+        0xC000001D: "ILLEGAL_INSTRUCTION",
+        0xC0000094: "INTEGER_DIVIDE_BY_ZERO",
+        0xC00000FD: "STACK_OVERFLOW",
+        0xC0000374: "HEAP_CORRUPTION",
+        0xC0000409: "STACK_BUFFER_OVERRUN",
+        0xE06D7363: "CPP_EXCEPTION",
+    }
+    ARCHITECTURES = {0: "x86", 5: "arm", 9: "x64", 12: "arm64"}
+
+
+    def __init__(self, path: Path):
+        self._path = path
+
+
+    def summary(self) -> MinidumpSummaryDTO:
+        with self._path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            signature, _, streams, directory_rva, _, timestamp, _ = Minidump._unpack(Minidump.HEADER, view, 0)
+            if signature != Minidump.SIGNATURE:
+                raise ValueError("not a minidump")
+
+            directory: dict[int, tuple[int, int]] = {}
+            for i in range(streams):
+                stream_type, size, rva = Minidump._unpack(Minidump.DIRECTORY_ENTRY, view, directory_rva + i * Minidump.DIRECTORY_ENTRY.size)
+                # The first stream of a type wins, unused entries have type 0
+                directory.setdefault(stream_type, (rva, size))
+
+            exception, address = self._exception(view, directory.get(Minidump.EXCEPTION_STREAM))
+            modules, faulting_module = self._modules(view, directory.get(Minidump.MODULE_LIST_STREAM), address)
+
+            return MinidumpSummaryDTO(
+                file=self._path.name,
+                size=len(view),
+                created_at=dt.datetime.fromtimestamp(timestamp, dt.timezone.utc).isoformat() if timestamp else None,
+                exception=exception,
+                faulting_module=faulting_module,
+                system=self._system(view, directory.get(Minidump.SYSTEM_INFO_STREAM)),
+                threads=self._threads(view, directory.get(Minidump.THREAD_LIST_STREAM)),
+                modules=modules,
+            )
+
+
+    def _modules(self, view: mmap.mmap, location: Optional[tuple[int, int]], address: Optional[int]) -> tuple[list[dict], Optional[str]]:
+        """Loaded modules and the name of the one the exception address falls into"""
+        if location is None:
+            return [], None
+        rva, _ = location
+        modules, faulting_module = [], None
+        for i in range(Minidump._unpack(Minidump.COUNT, view, rva)[0]):
+            offset = rva + 4 + i * Minidump.MODULE_SIZE
+            base, size, _, timestamp, name_rva = Minidump._unpack(Minidump.MODULE, view, offset)
+            version_ms, version_ls = Minidump._unpack(Minidump.VERSION, view, offset + Minidump.MODULE_VERSION_OFFSET)
+            path = Minidump._string(view, name_rva)
+            if address is not None and base <= address < base + size:
+                faulting_module = ntpath.basename(path)
+            modules.append({
+                "name": ntpath.basename(path),
+                "path": path,
+                "base": f"0x{base:08X}",
+                "size": size,
+                "timestamp": timestamp,
+                "version": f"{version_ms >> 16}.{version_ms & 0xFFFF}.{version_ls >> 16}.{version_ls & 0xFFFF}" if version_ms or version_ls else None,
+            })
+        return modules, faulting_module
+
+
+    def _exception(self, view: mmap.mmap, location: Optional[tuple[int, int]]) -> tuple[Optional[dict], Optional[int]]:
+        if location is None:
+            return None, None
+        thread_id, _, code, flags, _, address, parameters = Minidump._unpack(Minidump.EXCEPTION, view, location[0])
+        return {
+            "code": f"0x{code:08X}",
+            "name": Minidump.EXCEPTION_NAMES.get(code),
+            "address": f"0x{address:08X}",
+            "flags": flags,
+            "thread_id": thread_id,
+            "parameters": parameters,
+        }, address
+
+
+    def _threads(self, view: mmap.mmap, location: Optional[tuple[int, int]]) -> list[dict]:
+        if location is None:
+            return []
+        rva, _ = location
+        threads = []
+        for i in range(Minidump._unpack(Minidump.COUNT, view, rva)[0]):
+            thread_id, suspend_count, priority_class, priority, teb, stack_start, stack_size, _, _, _ = Minidump._unpack(
+                Minidump.THREAD, view, rva + 4 + i * Minidump.THREAD.size
+            )
+            threads.append({
+                "id": thread_id,
+                "suspend_count": suspend_count,
+                "priority_class": priority_class,
+                "priority": priority,
+                "teb": f"0x{teb:08X}",
+                "stack_start": f"0x{stack_start:08X}",
+                "stack_size": stack_size,
+            })
+        return threads
+
+
+    def _system(self, view: mmap.mmap, location: Optional[tuple[int, int]]) -> Optional[dict]:
+        if location is None:
+            return None
+        architecture, _, _, processors, _, major, minor, build, _ = Minidump._unpack(Minidump.SYSTEM_INFO, view, location[0])
+        return {
+            "architecture": Minidump.ARCHITECTURES.get(architecture, architecture),
+            "processors": processors,
+            "os_version": f"{major}.{minor}.{build}",
+        }
+
+
+    @staticmethod
+    def _unpack(layout: struct.Struct, view: mmap.mmap, offset: int) -> tuple:
+        if offset < 0 or offset + layout.size > len(view):
+            raise ValueError(f"truncated at offset {offset}")
+        return layout.unpack_from(view, offset)
+
+
+    @staticmethod
+    def _string(view: mmap.mmap, rva: int) -> str:
+        """MINIDUMP_STRING, byte length followed by UTF-16LE"""
+        length = Minidump._unpack(Minidump.COUNT, view, rva)[0]
+        if rva + 4 + length > len(view):
+            raise ValueError(f"truncated string at offset {rva}")
+        return view[rva + 4:rva + 4 + length].decode("utf-16-le", errors="replace")
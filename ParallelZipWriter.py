@@ -0,0 +1,324 @@
+from pathlib import Path
+from typing import Self, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dto.CompressionPlanDTO import CompressionPlanDTO
+from ReportVolumes import ReportVolumes
+from Tracer import Tracer, Span
+import shutil, tempfile, zipfile, zlib
+
+
+class ParallelZipWriter:
+    """
+    Compresses files for a `zipfile.ZipFile` on a thread pool and appends the pre-compressed streams to it.
+
+    DEFLATE members are split into chunks compressed independently (primed with the tail of the previous chunk),
+    flushed on a byte boundary and concatenated, so a single large crashdump scales with core count as well.
+    Chunk CRCs are merged with `crc32_combine`. Other methods are compressed as a whole in one worker, stored
+    members are copied by the calling thread. Members land in the archive in the order they were added,
+    with regular local headers and central directory entries, so any unzip tool can read the result.
+    A member can be a byte range of its file, eg. only the part of a log appended since a previous report.
+
+    Writing into size capped ReportVolumes, a member goes whole into the next part when the current one can not
+    take it. Members larger than a whole part are split into pieces while they are written: their chunks are smaller
+    and not primed, so a piece can end after any chunk (DEFLATE pieces are closed with an empty final block)
+    and the next one starts in a new part. Stored pieces fill a part up to the byte.
+    """
+
+    CHUNK_SIZE = 4 * 1024 * 1024
+    DICTIONARY_SIZE = 32 * 1024
+    SPOOL_SIZE = 8 * 1024 * 1024
+    QUEUE_DEPTH = 2
+    PIECE_CHUNK_SIZE = 1024 * 1024
+    # Final fixed Huffman block without any data, ends a stream flushed with Z_SYNC_FLUSH
+    END_OF_STREAM = b"\x03\x00"
+
+
+    def __init__(self, archive: zipfile.ZipFile | ReportVolumes, workers: int):
+        self._archive = archive
+        self._volumes: Optional[ReportVolumes] = archive if isinstance(archive, ReportVolumes) and archive.is_capped() else None
+        self._splittable: set[str] = set()
+        self._piece: Optional[list] = None
+        self._workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="zip")
+        self._pending: deque[tuple[Optional[zipfile.ZipInfo], Future | tuple[Path, int, Optional[int]], bool]] = deque()
+        self._current: Optional[tuple[zipfile.ZipInfo, bool]] = None
+        self._member_span: Optional[Span] = None
+        self._crc: int = 0
+        self._file_size: int = 0
+        self._compress_size: int = 0
+
+
+    def __enter__(self) -> Self:
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+    def write(self, path: Path, arcname: str | Path, plan: CompressionPlanDTO, start: int = 0, end: Optional[int] = None) -> None:
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = plan.compress_type
+        # Without an end the member takes whatever the file holds when it is read, logs can grow in the meantime
+        size = zinfo.file_size if end is None else min(end, zinfo.file_size)
+        zinfo.file_size = max(0, size - start)
+
+        splittable = self._volumes is not None and ParallelZipWriter._bound(zinfo) > self._volumes.capacity(zinfo.filename)
+        chunk_size = ParallelZipWriter.PIECE_CHUNK_SIZE if splittable else ParallelZipWriter.CHUNK_SIZE
+        if splittable:
+            self._splittable.add(zinfo.filename)
+            if plan.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                plan = CompressionPlanDTO(zipfile.ZIP_DEFLATED, 9, plan.ratio)
+                zinfo.compress_type = plan.compress_type
+
+        if plan.compress_type == zipfile.ZIP_STORED:
+            self._enqueue(zinfo, (path, start, end), True)
+        elif plan.compress_type == zipfile.ZIP_DEFLATED:
+            level = plan.compresslevel if plan.compresslevel is not None else zlib.Z_DEFAULT_COMPRESSION
+            offsets = range(start, size, chunk_size) or [start]
+            for i, offset in enumerate(offsets):
+                last = i == len(offsets) - 1
+                # A piece can start with any chunk of a split member, nothing before it can prime the dictionary
+                self._enqueue(zinfo if i == 0 else None, self._pool.submit(ParallelZipWriter._deflate_chunk, path, offset if splittable else start, offset, end, level, last, chunk_size), last)
+        else:
+            self._enqueue(zinfo, self._pool.submit(ParallelZipWriter._compress_whole, path, plan, start, end), True)
+
+
+    def close(self) -> None:
+        while self._pending:
+            self._write_next()
+        self._pool.shutdown(wait=True)
+
+
+    def _enqueue(self, zinfo: Optional[zipfile.ZipInfo], task: Future | tuple[Path, int, Optional[int]], last: bool) -> None:
+        self._pending.append((zinfo, task, last))
+        while len(self._pending) > self._workers * ParallelZipWriter.QUEUE_DEPTH:
+            self._write_next()
+
+
+    def _write_next(self) -> None:
+        zinfo, task, last = self._pending.popleft()
+        if zinfo is not None:
+            self._place(zinfo)
+            self._begin_member(zinfo)
+
+        if isinstance(task, tuple):
+            path, start, end = task
+            chunk_size = ParallelZipWriter.PIECE_CHUNK_SIZE if self._piece is not None else ParallelZipWriter.CHUNK_SIZE
+            with path.open("rb") as src:
+                position = src.seek(start)
+                while chunk := src.read(ParallelZipWriter._read_size(position, end, chunk_size)):
+                    position += len(chunk)
+                    self._member_span.add(bytes_read=len(chunk))
+                    if self._piece is not None and (room := max(0, self._volumes.room(self._current[0].filename))) < len(chunk):
+                        self._store(chunk[:room])
+                        self._next_piece()
+                        chunk = chunk[room:]
+                    self._store(chunk)
+        else:
+            data, crc, size = task.result()
+            if isinstance(data, bytes):
+                if self._piece is not None and self._volumes.room(self._current[0].filename) < len(data) + len(ParallelZipWriter.END_OF_STREAM):
+                    self._next_piece()
+                self._write(data)
+            else:
+                with data:
+                    data.seek(0)
+                    shutil.copyfileobj(data, self._get_archive().fp, ParallelZipWriter.CHUNK_SIZE)
+                    self._compress_size += data.tell()
+                    self._member_span.add(bytes_written=data.tell())
+            self._crc = ParallelZipWriter.crc32_combine(self._crc, crc, size)
+            self._file_size += size
+
+        if last:
+            self._end_member()
+            self._piece = None
+
+
+    def _store(self, chunk: bytes) -> None:
+        self._crc = zlib.crc32(chunk, self._crc)
+        self._file_size += len(chunk)
+        self._write(chunk)
+
+
+    def _write(self, data: bytes) -> None:
+        self._get_archive().fp.write(data)
+        self._compress_size += len(data)
+        self._member_span.add(bytes_written=len(data))
+
+
+    def _get_archive(self) -> zipfile.ZipFile:
+        return self._archive.get_archive() if isinstance(self._archive, ReportVolumes) else self._archive
+
+
+    def _place(self, zinfo: zipfile.ZipInfo) -> None:
+        """Moves on to the next part for a member that may not fit, split members start with their first piece right away"""
+        if self._volumes is None:
+            return
+        if zinfo.filename in self._splittable:
+            self._piece = [zinfo.filename, 1]
+            zinfo.filename = f"{zinfo.filename}.001"
+        else:
+            self._volumes.ensure_room(ParallelZipWriter._bound(zinfo), zinfo.filename)
+
+
+    def _next_piece(self) -> None:
+        zinfo, _ = self._current
+        if self._compress_size:
+            if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+                self._write(ParallelZipWriter.END_OF_STREAM)
+            remaining = max(0, zinfo.file_size - self._file_size)
+            self._end_member()
+            self._piece[1] += 1
+            piece = zipfile.ZipInfo(f"{self._piece[0]}.{self._piece[1]:03}", zinfo.date_time)
+            piece.compress_type = zinfo.compress_type
+            piece.external_attr = zinfo.external_attr
+            piece.file_size = remaining
+            zinfo = piece
+        else:
+            # Nothing of the piece made it into this part, its local header is dropped and it starts in the next one
+            archive = self._get_archive()
+            archive.fp.seek(zinfo.header_offset)
+            archive.fp.truncate()
+            Tracer.get().end(self._member_span)
+            self._current = None
+        self._volumes.rotate()
+        self._begin_member(zinfo)
+
+
+    # Mirrors what ZipFile._open_to_write and _ZipWriteFile.close do for a seekable archive
+    def _begin_member(self, zinfo: zipfile.ZipInfo) -> None:
+        archive = self._get_archive()
+        zinfo.flag_bits = 0x00
+        if zinfo.compress_type == zipfile.ZIP_LZMA:
+            # Compressed data includes an end-of-stream (EOS) marker
+            zinfo.flag_bits |= 0x02
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+        zinfo.compress_size = 0
+        zinfo.CRC = 0
+
+        # Compressed size can be larger than uncompressed size
+        zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        archive.fp.seek(archive.start_dir)
+        zinfo.header_offset = archive.fp.tell()
+        archive._writecheck(zinfo)
+        archive._didModify = True
+        archive.fp.write(zinfo.FileHeader(zip64))
+
+        self._current = (zinfo, zip64)
+        self._member_span = Tracer.get().begin("zip.member", "io", member=zinfo.filename)
+        self._crc = 0
+        self._file_size = 0
+        self._compress_size = 0
+
+
+    def _end_member(self) -> None:
+        archive = self._get_archive()
+        zinfo, zip64 = self._current
+        # Logs can grow while the report is being built, sizes are taken from what was actually read
+        zinfo.CRC = self._crc
+        zinfo.file_size = self._file_size
+        zinfo.compress_size = self._compress_size
+        if not zip64 and (zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT):
+            raise RuntimeError(f"Size of {zinfo.filename} is too large for a non ZIP64 member")
+
+        archive.start_dir = archive.fp.tell()
+        archive.fp.seek(zinfo.header_offset)
+        archive.fp.write(zinfo.FileHeader(zip64))
+        archive.fp.seek(archive.start_dir)
+
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+        if self._piece is not None:
+            self._volumes.add_piece(self._piece[0], zinfo)
+        self._current = None
+        # Wall time from the local header to the last byte, includes waiting for the compressing workers
+        Tracer.get().end(self._member_span.add(files=1))
+
+
+    @staticmethod
+    def _deflate_chunk(path: Path, start: int, offset: int, end: Optional[int], level: int, last: bool, chunk_size: int) -> tuple[bytes, int, int]:
+        with Tracer.get().span("zip.compress", "io", member=path.name, offset=offset) as span:
+            # Nothing before the start of the member can prime the dictionary, the decompressor never sees it
+            dictionary_offset = max(start, offset - ParallelZipWriter.DICTIONARY_SIZE)
+            with path.open("rb") as fh:
+                fh.seek(dictionary_offset)
+                dictionary = fh.read(offset - dictionary_offset)
+                data = fh.read(ParallelZipWriter._read_size(offset, end, chunk_size))
+
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary) if dictionary else zlib.compressobj(level, zlib.DEFLATED, -15)
+            compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+            span.add(bytes_read=len(dictionary) + len(data))
+            return compressed, zlib.crc32(data), len(data)
+
+
+    @staticmethod
+    def _compress_whole(path: Path, plan: CompressionPlanDTO, start: int, end: Optional[int]) -> tuple[tempfile.SpooledTemporaryFile, int, int]:
+        compressor = zipfile._get_compressor(plan.compress_type, plan.compresslevel)
+        out = tempfile.SpooledTemporaryFile(max_size=ParallelZipWriter.SPOOL_SIZE)
+        crc, size = 0, 0
+        with Tracer.get().span("zip.compress", "io", member=path.name, offset=start) as span, path.open("rb") as fh:
+            fh.seek(start)
+            while chunk := fh.read(ParallelZipWriter._read_size(start + size, end)):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                out.write(compressor.compress(chunk))
+            out.write(compressor.flush())
+            span.add(bytes_read=size)
+        return out, crc, size
+
+
+    @staticmethod
+    def _read_size(position: int, end: Optional[int], chunk_size: int = CHUNK_SIZE) -> int:
+        return chunk_size if end is None else max(0, min(chunk_size, end - position))
+
+
+    @staticmethod
+    def _bound(zinfo: zipfile.ZipInfo) -> int:
+        """Most a member can take in an archive, local header and ZIP64 extra field included, compressing never grows data much more"""
+        return zinfo.file_size + zinfo.file_size // 100 + 30 + 20 + len(zinfo.filename.encode())
+
+
+    @staticmethod
+    def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+        """CRC-32 of two concatenated blocks from their CRCs, port of zlib's crc32_combine"""
+        if len2 <= 0:
+            return crc1
+
+        def times(matrix: list[int], vector: int) -> int:
+            result, i = 0, 0
+            while vector:
+                if vector & 1:
+                    result ^= matrix[i]
+                vector >>= 1
+                i += 1
+            return result
+
+        def square(matrix: list[int]) -> list[int]:
+            return [times(matrix, matrix[n]) for n in range(32)]
+
+        # Operator for a single zero bit, then squared into two and four zero bits
+        odd = [0xEDB88320] + [1 << n for n in range(31)]
+        even = square(odd)
+        odd = square(even)
+
+        while True:
+            even = square(odd)
+            if len2 & 1:
+                crc1 = times(even, crc1)
+            len2 >>= 1
+            if not len2:
+                break
+            odd = square(even)
+            if len2 & 1:
+                crc1 = times(odd, crc1)
+            len2 >>= 1
+            if not len2:
+                break
+
+        return crc1 ^ crc2
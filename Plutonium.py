@@ -2,10 +2,16 @@ from pathlib import Path
 from typing import Self, Optional
 from collections.abc import Iterator, Callable
 from Game import Game
-import binascii, hashlib
+import os, re, json, binascii, hashlib, threading
 
 
 class Plutonium:
+    HASH_CHUNK_SIZE = 1024 * 1024
+    EXCLUDED_DIRS = frozenset({"crashdumps", "demos"})
+    NON_STATIC_FILE = re.compile(r"\.log|.\.cfg$")
+    # Hashing runs on a pool, every worker thread keeps its own chunk buffer
+    _hash_buffers = threading.local()
+
     def __init__(self):
         self._root: Path
 
@@ -42,7 +48,7 @@ class Plutonium:
 
     def get_configs_for(self, game: Game) -> list[Path]:
         config_path = self.path_storage() / game.value
-        return [cfg for cfg in Plutonium.dir_iterator(config_path, lambda x : x.suffix == ".cfg")]
+        return [cfg for cfg in Plutonium.dir_iterator(config_path, lambda x : x.suffix == ".cfg", Plutonium.is_excluded_dir)]
 
     def without_root(self, path: Path) -> str:
         try:
@@ -50,34 +56,118 @@ class Plutonium:
         except ValueError:
             return str(path)
 
+    def get_revision(self) -> Optional[int]:
+        try:
+            return int(json.loads((self._root / "info.json").read_text(encoding="utf-8"))["revision"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
     def is_valid_plutonium_directory(self) -> bool:
         return self.path_bin().exists() and self.path_games().exists() and self.path_launcher().exists() and self.path_storage().exists()
 
     def get_hashes(self, file: Path) -> dict[str, str]:
+        # Single read pass, every digest is fed from the same reused chunk buffer
+        crc32 = 0
+        sha1 = hashlib.sha1(usedforsecurity=False)
+        sha256 = hashlib.sha256(usedforsecurity=False)
+
+        buffer, view = Plutonium._hash_buffer()
+        with file.open("rb", buffering=0) as fh:
+            while size := fh.readinto(buffer):
+                chunk = view[:size]
+                crc32 = binascii.crc32(chunk, crc32)
+                sha1.update(chunk)
+                sha256.update(chunk)
+
         return {
-            "crc32": "0x" + format(binascii.crc32(file.read_bytes()) & 0xFFFFFFFF, "08X"),
-            "sha1": hashlib.sha1(file.read_bytes(), usedforsecurity=False).hexdigest(),
-            "sha256": hashlib.sha256(file.read_bytes(), usedforsecurity=False).hexdigest(),
+            "crc32": "0x" + format(crc32 & 0xFFFFFFFF, "08X"),
+            "sha1": sha1.hexdigest(),
+            "sha256": sha256.hexdigest(),
         }
 
     @staticmethod
-    def dir_iterator(path: Path, filter: Optional[Callable[[Path], bool]] = None) -> Iterator[Path]:
-        for file in path.iterdir():
-            if file.is_dir():
-                yield from Plutonium.dir_iterator(file, filter)
-            elif callable(filter) and not filter(file):
+    def _hash_buffer() -> tuple[bytearray, memoryview]:
+        local = Plutonium._hash_buffers
+        if not hasattr(local, "buffer"):
+            local.buffer = bytearray(Plutonium.HASH_CHUNK_SIZE)
+            local.view = memoryview(local.buffer)
+        return local.buffer, local.view
+
+    @staticmethod
+    def dir_iterator(path: Path, filter: Optional[Callable[[Path], bool]] = None, prune: Optional[Callable[[os.DirEntry], bool]] = None) -> Iterator[Path]:
+        for entry in Plutonium.scan_tree(path, None, prune):
+            file = Path(entry.path)
+            if callable(filter) and not filter(file):
+                continue
+            yield file
+
+    @staticmethod
+    def scan_tree(path: Path, filter: Optional[Callable[[os.DirEntry], bool]] = None, prune: Optional[Callable[[os.DirEntry], bool]] = None) -> Iterator[os.DirEntry]:
+        """
+        Iterative depth-first walk yielding files in the same order as a recursive walk would.
+        Uses the type information cached on `os.DirEntry`, skips directories matched by `prune`
+        without descending into them and walks every directory once, whether it is reached directly or through a link.
+        """
+        root = os.path.normcase(os.path.realpath(path))
+        visited: set[str] = {root}
+        # Every directory on the stack carries its real path, so only links need resolving
+        stack: list[tuple[Iterator[os.DirEntry], str]] = [(iter(Plutonium._list_dir(path)), root)]
+
+        while stack:
+            entries, real_dir = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            try:
+                is_dir = entry.is_dir()
+                if not is_dir and not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            if is_dir:
+                if callable(prune) and prune(entry):
+                    continue
+                if entry.is_symlink() or Plutonium._is_junction(entry):
+                    real_path = os.path.normcase(os.path.realpath(entry.path))
+                else:
+                    real_path = os.path.join(real_dir, os.path.normcase(entry.name))
+                # A directory reached both directly and through a link is only walked the first time
+                if real_path in visited:
+                    continue
+                visited.add(real_path)
+                stack.append((iter(Plutonium._list_dir(entry.path)), real_path))
+            elif callable(filter) and not filter(entry):
                 continue
             else:
-                yield file
+                yield entry
+
+    @staticmethod
+    def _list_dir(path: Path | str) -> list[os.DirEntry]:
+        try:
+            with os.scandir(path) as it:
+                return list(it)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _is_junction(entry: os.DirEntry) -> bool:
+        # DirEntry.is_junction only exists since Python 3.12
+        is_junction = getattr(entry, "is_junction", None)
+        return bool(is_junction and is_junction())
+
+    @staticmethod
+    def is_excluded_dir(entry: os.DirEntry) -> bool:
+        return entry.name in Plutonium.EXCLUDED_DIRS
+
+    @staticmethod
+    def is_static_entry(entry: os.DirEntry) -> bool:
+        return Plutonium.NON_STATIC_FILE.search(entry.name) is None
 
     @staticmethod
     def is_static_file(file: Path) -> bool:
-        if file.match("crashdumps"):
-            return False
-        if file.match("demos/*"):
-            return False
-        if file.suffix == ".cfg":
-            return False
-        if ".log" in file.name:
+        if file.parent.name in Plutonium.EXCLUDED_DIRS:
             return False
-        return True
+        return Plutonium.NON_STATIC_FILE.search(file.name) is None
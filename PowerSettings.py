@@ -1,5 +1,8 @@
 import subprocess, re
+from typing import Optional
+from collections.abc import Iterable, Iterator
 from dto.PowerSettingsDTO import PowerSettingsDTO
+from Tracer import Tracer
 
 
 class PowerSettings:
@@ -8,45 +11,93 @@ class PowerSettings:
     Compatible with Windows 10 and Windows 11.
     """
 
+    # Friendly names accepted for `--power-subgroups`, anything else is passed to powercfg as is (alias or GUID)
+    SUBGROUP_ALIASES = {
+        "none": "SUB_NONE",
+        "disk": "SUB_DISK",
+        "sleep": "SUB_SLEEP",
+        "usb": "SUB_USB",
+        "pcie": "SUB_PCIEXPRESS",
+        "processor": "SUB_PROCESSOR",
+        "display": "SUB_VIDEO",
+    }
+
+    # Lines are dispatched on their first 10 characters, every kind has a distinct prefix
+    PREFIX_LENGTH = 10
+    LINE_PATTERNS = {
+        "Power Sche": ("scheme", re.compile(r"Power Scheme GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)")),
+        "Subgroup G": ("subgroup", re.compile(r"Subgroup GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)")),
+        "Power Sett": ("setting", re.compile(r"Power Setting GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)")),
+        "Current AC": ("ac_value", re.compile(r"Current AC Power Setting Index: ([0-9a-fA-Fx]+)")),
+        "Current DC": ("dc_value", re.compile(r"Current DC Power Setting Index: ([0-9a-fA-Fx]+)")),
+    }
+
+
+    def __init__(self, subgroups: Optional[Iterable[str]] = None):
+        self._subgroups = [PowerSettings.SUBGROUP_ALIASES.get(subgroup.lower(), subgroup) for subgroup in subgroups or ()]
+
 
     def collect(self) -> PowerSettingsDTO:
-        raw = self._run_powercfg()
-        return PowerSettingsDTO(self._parse_powercfg(raw), raw)
+        raw: list[str] = []
+        try:
+            with Tracer.get().span("powercfg", "collector") as span:
+                parsed = self._parse_lines(PowerSettings._tee(self._stream_powercfg(), raw))
+                span.add(bytes_read=sum(len(line) for line in raw))
+        except Exception as e:
+            return PowerSettingsDTO({}, f"error: {e}")
+        return PowerSettingsDTO(parsed, "".join(raw))
 
     # ---------------------------------------------------------
     # Run powercfg
     # ---------------------------------------------------------
-    def _run_powercfg(self) -> str:
-        try:
-            proc = subprocess.run(
-                ["powercfg", "/query"],
-                capture_output=True,
+    def _stream_powercfg(self) -> Iterator[str]:
+        """
+        Yields output lines as powercfg prints them, the whole active scheme or only the selected subgroups.
+        powercfg takes a single subgroup per query, so it runs once for each of them.
+        """
+        for args in ([["SCHEME_CURRENT", subgroup] for subgroup in self._subgroups] or [[]]):
+            with subprocess.Popen(
+                ["powercfg", "/query", *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
-                check=True,
-            )
-            return proc.stdout
-        except Exception as e:
-            return f"error: {e}"
+            ) as proc:
+                yield from proc.stdout
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
-    # ---------------------------------------------------------
-    # Parse the entire output
-    # ---------------------------------------------------------
-    def _parse_powercfg(self, text: str) -> dict:
+
+    @staticmethod
+    def _tee(lines: Iterable[str], raw: list[str]) -> Iterator[str]:
+        for line in lines:
+            raw.append(line)
+            yield line
+
+
+    def _parse_lines(self, lines: Iterable[str]) -> dict:
+        """
+        Single pass over the output, every line is matched against at most one precompiled pattern
+        picked by its prefix and values are interpreted as soon as they are read.
+        """
         schemes = {}
         current_scheme = None
         current_subgroup = None
         current_setting = None
-
-        lines = text.splitlines()
+        patterns = PowerSettings.LINE_PATTERNS
+        prefix_length = PowerSettings.PREFIX_LENGTH
 
         for line in lines:
             line = line.strip()
+            dispatch = patterns.get(line[:prefix_length])
+            if dispatch is None:
+                continue
 
-            # -------------------------------
-            # Power Scheme
-            # -------------------------------
-            m = re.match(r"Power Scheme GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)", line)
-            if m:
+            kind, pattern = dispatch
+            m = pattern.match(line)
+            if not m:
+                continue
+
+            if kind == "scheme":
                 guid, name = m.groups()
                 current_scheme = schemes.setdefault(guid, {
                     "name": name,
@@ -54,26 +105,18 @@ class PowerSettings:
                 })
                 current_subgroup = None
                 current_setting = None
-                continue
-
-            # -------------------------------
-            # Subgroup
-            # -------------------------------
-            m = re.match(r"Subgroup GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)", line)
-            if m:
+            elif kind == "subgroup":
+                if current_scheme is None:
+                    continue
                 guid, name = m.groups()
                 current_subgroup = current_scheme["subgroups"].setdefault(guid, {
                     "name": name,
                     "settings": {}
                 })
                 current_setting = None
-                continue
-
-            # -------------------------------
-            # Setting
-            # -------------------------------
-            m = re.match(r"Power Setting GUID: ([0-9a-fA-F\-]+)\s+\((.+)\)", line)
-            if m:
+            elif kind == "setting":
+                if current_subgroup is None:
+                    continue
                 guid, name = m.groups()
                 current_setting = current_subgroup["settings"].setdefault(guid, {
                     "name": name,
@@ -81,38 +124,13 @@ class PowerSettings:
                     "dc_value": None,
                     "interpretation": None,
                 })
-                continue
-
-            # -------------------------------
-            # AC value
-            # -------------------------------
-            m = re.match(r"Current AC Power Setting Index: ([0-9a-fA-Fx]+)", line)
-            if m and current_setting:
-                current_setting["ac_value"] = m.group(1)
-                continue
-
-            # -------------------------------
-            # DC value
-            # -------------------------------
-            m = re.match(r"Current DC Power Setting Index: ([0-9a-fA-Fx]+)", line)
-            if m and current_setting:
-                current_setting["dc_value"] = m.group(1)
-                continue
-
-        # After parsing, interpret values
-        self._interpret_all(schemes)
+                current_setting["interpretation"] = self._interpret_setting(current_setting)
+            elif current_setting:
+                current_setting[kind] = m.group(1)
+                current_setting["interpretation"] = self._interpret_setting(current_setting)
 
         return schemes
 
-    # ---------------------------------------------------------
-    # Interpret values into human-readable form
-    # ---------------------------------------------------------
-    def _interpret_all(self, schemes: dict):
-        for scheme in schemes.values():
-            for subgroup in scheme["subgroups"].values():
-                for setting in subgroup["settings"].values():
-                    setting["interpretation"] = self._interpret_setting(setting)
-
     # ---------------------------------------------------------
     # Interpret a single setting
     # ---------------------------------------------------------
@@ -120,7 +138,6 @@ class PowerSettings:
         """
         Converts hex values into human-readable meaning when possible.
         """
-        name = setting["name"].lower()
         ac = setting["ac_value"]
         dc = setting["dc_value"]
 
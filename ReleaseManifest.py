@@ -0,0 +1,135 @@
+from pathlib import Path
+from typing import Self, Optional
+from collections.abc import Iterable, Iterator
+from dto.FileHashDTO import FileHashDTO
+from dto.ManifestDiffDTO import ManifestDiffDTO
+from Tracer import Tracer
+import os, mmap
+
+
+class ReleaseManifest:
+    """
+    Expected size and digests of every static file of a known-good Plutonium install of one revision.
+
+    One header line followed by one line per file, sorted by relative path (always with forward slashes):
+
+        #b2-manifest 1 revision=4516 fields=crc32,sha1,sha256
+        bin/plutonium-bootstrapper-win32.exe<TAB>size<TAB>crc32<TAB>sha1<TAB>sha256
+
+    As lines are sorted, `diff` walks the memory mapped manifest and the sorted install side by side in a single pass.
+    """
+
+    MAGIC = "#b2-manifest"
+    VERSION = 1
+    FIELDS = ("crc32", "sha1", "sha256")
+
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._data: Optional[mmap.mmap] = None
+        self._start: int = 0
+        self.revision: Optional[int] = None
+        self.fields: tuple[str, ...] = ReleaseManifest.FIELDS
+
+
+    def __enter__(self) -> Self:
+        return self.open()
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+    @staticmethod
+    def default_location(revision: int) -> Path:
+        base = os.environ.get("localappdata")
+        return (Path(base) if base else Path.home() / ".cache") / "B2-Plutonium-Reporter" / "manifests" / f"r{revision}.manifest"
+
+
+    @staticmethod
+    def key(relative_path: str) -> str:
+        return relative_path.replace("\\", "/")
+
+
+    @staticmethod
+    def write(path: Path, revision: int, hashes: Iterable[FileHashDTO]) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix(".tmp")
+        with tmp_file.open("w", encoding="utf-8", newline="\n") as fh:
+            fh.write(f"{ReleaseManifest.MAGIC} {ReleaseManifest.VERSION} revision={revision} fields={','.join(ReleaseManifest.FIELDS)}\n")
+            for key, dto in sorted(((ReleaseManifest.key(dto.path), dto) for dto in hashes), key=lambda item: item[0]):
+                fh.write("\t".join([key, str(dto.size), *(dto.hashes.get(field, "") for field in ReleaseManifest.FIELDS)]) + "\n")
+        tmp_file.replace(path)
+        return path
+
+
+    def open(self) -> Self:
+        with self._path.open("rb") as fh:
+            self._data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_end = self._data.find(b"\n")
+        header = self._data[:header_end if header_end != -1 else len(self._data)].decode("utf-8").split()
+        assert header[:2] == [ReleaseManifest.MAGIC, str(ReleaseManifest.VERSION)], f"{self._path} is not a version {ReleaseManifest.VERSION} release manifest"
+        options = dict(option.split("=", 1) for option in header[2:])
+        self.revision = int(options["revision"]) if "revision" in options else None
+        self.fields = tuple(options["fields"].split(",")) if "fields" in options else ReleaseManifest.FIELDS
+        self._start = header_end + 1 if header_end != -1 else len(self._data)
+        return self
+
+
+    def close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+
+    def entries(self) -> Iterator[tuple[str, int, dict[str, str]]]:
+        self._data.seek(self._start)
+        for line in iter(self._data.readline, b""):
+            if line.strip():
+                yield self._parse(line.decode("utf-8").rstrip("\n"))
+
+
+    def diff(self, hashes: Iterable[FileHashDTO]) -> ManifestDiffDTO:
+        """Missing, extra and modified files, every path in the result is a manifest key with forward slashes"""
+        missing: list[str] = []
+        extra: list[dict] = []
+        modified: list[dict] = []
+        matched = 0
+
+        with Tracer.get().span("manifest.diff", "step") as span:
+            installed = iter(sorted(((ReleaseManifest.key(dto.path), dto) for dto in hashes), key=lambda item: item[0]))
+            current = next(installed, None)
+            for path, size, expected in self.entries():
+                while current is not None and current[0] < path:
+                    extra.append({**vars(current[1]), "path": current[0]})
+                    current = next(installed, None)
+
+                if current is None or current[0] != path:
+                    missing.append(path)
+                    continue
+
+                dto = current[1]
+                if dto.size != size or any(dto.hashes.get(field) != digest for field, digest in expected.items()):
+                    modified.append({"path": path, "expected": {"size": size, "hashes": expected}, "actual": {"size": dto.size, "hashes": dto.hashes}})
+                else:
+                    matched += 1
+                current = next(installed, None)
+
+            while current is not None:
+                extra.append({**vars(current[1]), "path": current[0]})
+                current = next(installed, None)
+            span.add(files=matched + len(missing) + len(modified) + len(extra))
+
+        return ManifestDiffDTO(
+            revision=self.revision,
+            summary={"matched": matched, "missing": len(missing), "extra": len(extra), "modified": len(modified)},
+            missing=missing,
+            extra=extra,
+            modified=modified,
+        )
+
+
+    def _parse(self, line: str) -> tuple[str, int, dict[str, str]]:
+        path, size, *digests = line.split("\t")
+        return path, int(size), {field: digest for field, digest in zip(self.fields, digests) if digest}
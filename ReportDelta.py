@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Optional, Self
+from collections.abc import Iterable, Iterator
+from EventArchive import EventArchive
+from FileHashTable import FileHashTable
+from ParallelZipWriter import ParallelZipWriter
+from ReportReader import ReportReader
+from ReportVolumes import ReportVolumes
+from Tracer import Tracer
+import json, uuid, zlib, zipfile
+
+
+class ReportDelta:
+    """
+    State of a report written into its `report-manifest.json`, and the baseline for `--since <previous report>`.
+
+    The manifest lists every log and config as of the report with its size, modification time and CRC-32 of the whole
+    file, how it was shipped (`full`, `append` from `offset`, `unchanged` and only present in an earlier report,
+    `window`, only the bytes from `offset` around a crash and the size and CRC-32 describe that part, or `summary`,
+    a crashdump left out with only its summary in general.json and no CRC-32),
+    size and CRC-32 of every hashed file, and the last event record id. A merge tool rebuilds the full view
+    of a delta report by walking the chain of `since` reports, appending `append` members to the previous content
+    and taking `unchanged` members from the report before. Reports without a manifest can still be a baseline,
+    the state is then taken from the archive members, general.json and events/index.json. Split reports are read
+    through ReportReader, from any of their parts.
+    """
+
+    MEMBER = "report-manifest.json"
+    VERSION = 1
+    FILE_DIRS = ("logs/", "configs/")
+    READ_SIZE = 1024 * 1024
+
+
+    def __init__(self):
+        self._report_id: str = uuid.uuid4().hex
+        self._since: Optional[dict[str, Optional[str]]] = None
+        self._previous_files: dict[str, dict] = {}
+        self._previous_hashes: Optional[dict[str, list[int]]] = None
+        self._previous_record_id: Optional[int] = None
+        self._planned: dict[str, dict] = {}
+        self._files: dict[str, dict] = {}
+        self._last_record_id: Optional[int] = None
+        self._new_events: int = 0
+
+
+    def is_delta(self) -> bool:
+        return self._since is not None
+
+
+    def load(self, previous: Path) -> Self:
+        with Tracer.get().span("delta.load", "io") as span, ReportReader(previous) as report:
+            names = set(report.namelist())
+            if ReportDelta.MEMBER in names:
+                manifest = json.loads(report.read(ReportDelta.MEMBER))
+                assert manifest.get("version") == ReportDelta.VERSION, f"Unsupported report manifest version {manifest.get('version')}"
+                self._since = {"report": previous.name, "report_id": manifest["report_id"]}
+                self._previous_files = manifest["files"]
+                self._previous_hashes = manifest["hashes"]
+                self._previous_record_id = manifest["events"]["last_record_id"]
+            else:
+                self._since = {"report": previous.name, "report_id": None}
+                self._load_without_manifest(report, names)
+            span.add(files=len(self._previous_files))
+        self._last_record_id = self._previous_record_id
+        return self
+
+
+    def _load_without_manifest(self, report: ReportReader, names: set[str]) -> None:
+        """Reports from before manifests, only complete members and listings can be compared against"""
+        self._previous_files = {
+            info.filename: {"size": info.file_size, "mtime_ns": None, "crc32": info.CRC}
+            for info in report.infolist() if info.filename.startswith(ReportDelta.FILE_DIRS) and not info.is_dir()
+        }
+        general = json.loads(report.read("general.json"))
+        if isinstance(general.get("file_hashes"), list):
+            self._previous_hashes = {entry["path"]: [entry["size"], int(entry["hashes"]["crc32"], 16)] for entry in general["file_hashes"]}
+
+        record_ids: Iterable[Optional[int]] = ()
+        if EventArchive.INDEX in names:
+            record_ids = (event["record_id"] for event in json.loads(report.read(EventArchive.INDEX))["events"])
+        else:
+            record_ids = (ReportDelta._record_id(report.read(name).decode("utf-8")) for name in names if name.startswith("events/") and name.endswith(".xml"))
+        self._previous_record_id = max((record_id for record_id in record_ids if record_id is not None), default=None)
+
+
+    def plan(self, member: str, path: Path) -> tuple[str, int]:
+        """How the file goes into this report, `full`, `append` from the returned offset or `unchanged`"""
+        stat = path.stat()
+        previous = self._previous_files.get(member)
+        mode, offset = "full", 0
+        # A window is only part of the file and a summary has no content, neither can be compared against
+        if previous is not None and previous.get("mode") not in ("window", "summary") and stat.st_size >= previous["size"]:
+            if stat.st_size == previous["size"] and stat.st_mtime_ns == previous["mtime_ns"]:
+                mode = "unchanged"
+            elif ReportDelta._prefix_crc(path, previous["size"]) == previous["crc32"]:
+                # Logs are only ever appended to, anything else (rotated, rewritten) is shipped again in full
+                mode, offset = ("unchanged", 0) if stat.st_size == previous["size"] else ("append", previous["size"])
+
+        self._planned[member] = {"mode": mode, "offset": offset, "mtime_ns": stat.st_mtime_ns}
+        return mode, offset
+
+
+    def window(self, member: str, path: Path, start: int) -> None:
+        self._planned[member] = {"mode": "window", "offset": start, "mtime_ns": path.stat().st_mtime_ns}
+
+
+    def summarized(self, member: str, path: Path) -> None:
+        """Crashdump still present, but only summarized, so it does not count as removed"""
+        stat = path.stat()
+        self._planned[member] = {"mode": "summary", "offset": 0, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+    def record(self, volumes: ReportVolumes) -> None:
+        """Whole file sizes and CRCs of the planned files, once their members (or pieces of them) were written"""
+        for member, planned in self._planned.items():
+            previous = self._previous_files.get(member)
+            if planned["mode"] == "unchanged":
+                size, crc = previous["size"], previous["crc32"]
+            elif planned["mode"] == "summary":
+                size, crc = planned["size"], None
+            else:
+                first, *pieces = volumes.infos(member)
+                size, crc = first.file_size, first.CRC
+                for info in pieces:
+                    size, crc = size + info.file_size, ParallelZipWriter.crc32_combine(crc, info.CRC, info.file_size)
+                if planned["mode"] == "append":
+                    size, crc = planned["offset"] + size, ParallelZipWriter.crc32_combine(previous["crc32"], crc, size)
+            self._files[member] = {"size": size, "mtime_ns": planned["mtime_ns"], "crc32": crc, "mode": planned["mode"], "offset": planned["offset"]}
+
+
+    def new_events(self, events: Iterable[str]) -> Iterator[str]:
+        """Events newer than the last one of the previous report by record id, all of them without one"""
+        for event in events:
+            record_id = ReportDelta._record_id(event)
+            if record_id is not None:
+                if self._previous_record_id is not None and record_id <= self._previous_record_id:
+                    continue
+                self._last_record_id = max(record_id, self._last_record_id or 0)
+            self._new_events += 1
+            yield event
+
+
+    def hash_delta(self, hashes: FileHashTable) -> Optional[dict[str, list]]:
+        """Rows that changed or appeared since the previous report and paths that disappeared, None without a baseline"""
+        if self._previous_hashes is None:
+            return None
+        changed: list[dict] = []
+        seen: set[str] = set()
+        for i, (path, size, crc32) in enumerate(hashes.checksums()):
+            seen.add(path)
+            if self._previous_hashes.get(path) != [size, crc32]:
+                changed.append(vars(hashes.row(i)))
+        return {"changed": changed, "removed": sorted(path for path in self._previous_hashes if path not in seen)}
+
+
+    def summary(self) -> dict[str, int]:
+        summary = {"full": 0, "append": 0, "unchanged": 0, "window": 0, "summary": 0}
+        for entry in self._files.values():
+            summary[entry["mode"]] += 1
+        summary["removed"] = len(self._previous_files.keys() - self._files.keys())
+        summary["new_events"] = self._new_events
+        return summary
+
+
+    def write(self, report: zipfile.ZipFile, hashes: FileHashTable) -> None:
+        with Tracer.get().span("zip.report_manifest", "io") as span:
+            report.writestr(ReportDelta.MEMBER, json.dumps({
+                "version": ReportDelta.VERSION,
+                "report_id": self._report_id,
+                "since": self._since,
+                "files": self._files,
+                "removed": sorted(self._previous_files.keys() - self._files.keys()),
+                "hashes": {path: [size, crc32] for path, size, crc32 in hashes.checksums()},
+                "events": {"last_record_id": self._last_record_id, "shipped": self._new_events},
+            }))
+            span.add(files=1, bytes_written=report.getinfo(ReportDelta.MEMBER).compress_size)
+
+
+    @staticmethod
+    def _prefix_crc(path: Path, length: int) -> int:
+        crc = 0
+        with path.open("rb") as fh:
+            while length > 0 and (chunk := fh.read(min(ReportDelta.READ_SIZE, length))):
+                crc = zlib.crc32(chunk, crc)
+                length -= len(chunk)
+        return crc
+
+
+    @staticmethod
+    def _record_id(event: str) -> Optional[int]:
+        match = EventArchive.RECORD_ID.search(event)
+        return int(match.group(1)) if match else None
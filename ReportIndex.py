@@ -0,0 +1,339 @@
+from pathlib import Path
+from typing import Optional, Self
+from collections.abc import Iterable, Iterator
+from Crashdump import Crashdump
+from EventArchive import EventArchive
+from ReleaseManifest import ReleaseManifest
+from ReportReader import ReportReader
+from ReportVolumes import ReportVolumes
+import re, json, sqlite3, zipfile
+
+
+class ReportIndex:
+    """
+    SQLite index over `b2-report-*.zip` archives for support side triage. general.json and the events are read
+    straight from the archive members, nothing is extracted to disk. Archives are only read again when they are new
+    or their size/modification time changed, so the same inbox can be added over and over.
+    """
+
+    # 2: hash deviation paths are stored as release manifest keys
+    SCHEMA_VERSION = 2
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reports (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            reporter_version TEXT,
+            created_at TEXT,
+            game TEXT,
+            revision INTEGER,
+            root_path TEXT,
+            crashdumps_detected INTEGER,
+            missing_files INTEGER,
+            extra_files INTEGER,
+            modified_files INTEGER,
+            cpu TEXT,
+            gpu TEXT,
+            gpu_driver TEXT,
+            ram_bytes INTEGER,
+            os TEXT,
+            os_build TEXT,
+            stage_errors TEXT
+        );
+        CREATE TABLE IF NOT EXISTS crashdumps (
+            report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+            file TEXT NOT NULL,
+            revision INTEGER,
+            game TEXT,
+            crashed_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS hash_deviations (
+            report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            path TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+            event_id INTEGER,
+            record_id INTEGER,
+            time_created TEXT,
+            provider TEXT,
+            fault_module TEXT,
+            exception_code TEXT
+        );
+        CREATE INDEX IF NOT EXISTS reports_revision ON reports(revision, game);
+        CREATE INDEX IF NOT EXISTS reports_game ON reports(game);
+        CREATE INDEX IF NOT EXISTS crashdumps_report ON crashdumps(report_id);
+        CREATE INDEX IF NOT EXISTS crashdumps_crashed_at ON crashdumps(crashed_at);
+        CREATE INDEX IF NOT EXISTS hash_deviations_report ON hash_deviations(report_id);
+        CREATE INDEX IF NOT EXISTS hash_deviations_path ON hash_deviations(path COLLATE NOCASE, kind);
+        CREATE INDEX IF NOT EXISTS events_report ON events(report_id);
+        CREATE INDEX IF NOT EXISTS events_fault_module ON events(fault_module COLLATE NOCASE);
+    """
+    TABLES = ("events", "hash_deviations", "crashdumps", "reports")
+
+    # Application Error (1000) data, named on newer Windows builds and positional on older ones
+    APPLICATION_ERROR = 1000
+    NAMED_DATA = re.compile(r"<Data Name=['\"](\w+)['\"]>([^<]*)</Data>")
+    DATA = re.compile(r"<Data(?: Name=['\"]\w*['\"])?>([^<]*)</Data>")
+    FAULTING_MODULE_POSITION = 3
+    EXCEPTION_CODE_POSITION = 6
+
+
+    def __init__(self, db_file: Path):
+        self._db_file = db_file
+        self._db: Optional[sqlite3.Connection] = None
+
+
+    @staticmethod
+    def default_location() -> Path:
+        return Path.cwd() / "b2-reports.sqlite"
+
+
+    def __enter__(self) -> Self:
+        return self.open()
+
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+    def open(self) -> Self:
+        self._db = sqlite3.connect(self._db_file)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, ReportIndex.SCHEMA_VERSION):
+            # Everything in the index can be read again from the archives
+            print(f"\tIndex was built with schema {version}, rebuilding it, archives have to be added again")
+            for table in ReportIndex.TABLES:
+                self._db.execute(f"DROP TABLE IF EXISTS {table}")
+        self._db.executescript(ReportIndex.SCHEMA)
+        self._db.execute(f"PRAGMA user_version = {ReportIndex.SCHEMA_VERSION}")
+        return self
+
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+    @staticmethod
+    def find_archives(paths: Iterable[Path]) -> Iterator[Path]:
+        for path in paths:
+            if path.is_dir():
+                # A report split into parts is indexed once, from its last part
+                yield from sorted(archive for archive in path.rglob("b2-report-*.zip") if ReportVolumes.last_part(archive) == archive)
+            elif zipfile.is_zipfile(path):
+                yield path
+            else:
+                print(f"\tSkipping {path}, not a report archive or a directory")
+
+
+    def add(self, paths: Iterable[Path]) -> dict[str, int]:
+        """Indexes new and changed archives, returns how many were added, updated, unchanged and unreadable"""
+        known: dict[str, tuple[int, int, int]] = {
+            row["path"]: (row["id"], row["size"], row["mtime_ns"]) for row in self._db.execute("SELECT id, path, size, mtime_ns FROM reports")
+        }
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        for archive in ReportIndex.find_archives(paths):
+            path = str(archive.resolve())
+            stat = archive.stat()
+            previous = known.get(path)
+            if previous is not None and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+
+            try:
+                with self._db:
+                    if previous is not None:
+                        self._db.execute("DELETE FROM reports WHERE id = ?", (previous[0],))
+                    self._insert(path, stat.st_size, stat.st_mtime_ns, archive)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+                print(f"\tCould not index {archive} ({type(exc).__name__}: {exc})")
+                stats["failed"] += 1
+                continue
+            stats["updated" if previous is not None else "added"] += 1
+        return stats
+
+
+    def _insert(self, path: str, size: int, mtime_ns: int, archive: Path) -> None:
+        with ReportReader(archive) as report:
+            with report.open("general.json") as fh:
+                general: dict = json.load(fh)
+            names = report.namelist()
+
+            hardware: dict = general.get("hardware_info") or {}
+            diff: dict = general.get("file_hashes_diff") or {}
+            # Crashdumps left out with --dump-summary-only are only listed in general.json
+            summarized = [summary["file"] for summary in general.get("crashdumps") or []]
+            crashdumps = list(ReportIndex.crashdumps([*names, *summarized]))
+            revision = general.get("plutonium_revision") or diff.get("revision") or next((crashdump[1] for crashdump in crashdumps), None)
+            gpus = hardware.get("gpu") or []
+
+            report_id = self._db.execute(
+                "INSERT INTO reports (path, size, mtime_ns, reporter_version, created_at, game, revision, root_path, crashdumps_detected, "
+                "missing_files, extra_files, modified_files, cpu, gpu, gpu_driver, ram_bytes, os, os_build, stage_errors) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path, size, mtime_ns,
+                    general.get("reporter_version"),
+                    general.get("created_at"),
+                    general.get("game"),
+                    revision,
+                    general.get("root_path"),
+                    general.get("crashdumps_detected"),
+                    len(diff["missing"]) if diff else None,
+                    len(diff["extra"]) if diff else None,
+                    len(diff["modified"]) if diff else None,
+                    ", ".join(str(cpu.get("name")) for cpu in hardware.get("cpu") or []) or None,
+                    ", ".join(str(gpu.get("name")) for gpu in gpus) or None,
+                    ", ".join(str(gpu.get("driver_version")) for gpu in gpus) or None,
+                    sum(ReportIndex._int(mem.get("capacity_bytes")) or 0 for mem in hardware.get("ram") or []) or None,
+                    (hardware.get("os") or {}).get("name"),
+                    (hardware.get("os") or {}).get("build_number"),
+                    json.dumps(general["stage_errors"]) if general.get("stage_errors") else None,
+                ),
+            ).lastrowid
+
+            self._db.executemany(
+                "INSERT INTO crashdumps (report_id, file, revision, game, crashed_at) VALUES (?, ?, ?, ?, ?)",
+                ((report_id, *crashdump) for crashdump in crashdumps),
+            )
+            self._db.executemany(
+                "INSERT INTO hash_deviations (report_id, kind, path) VALUES (?, ?, ?)",
+                (
+                    # Reports from before manifest keys in every list have OS paths for extra and modified files
+                    (report_id, kind, ReleaseManifest.key(entry if isinstance(entry, str) else entry["path"]))
+                    for kind in ("missing", "extra", "modified")
+                    for entry in diff.get(kind, [])
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO events (report_id, event_id, record_id, time_created, provider, fault_module, exception_code) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (report_id, entry.event_id, entry.record_id, entry.time_created, entry.provider, *ReportIndex.fault(entry.event_id, event))
+                    for entry, event in ReportIndex.events(report, names)
+                ),
+            )
+
+
+    @staticmethod
+    def crashdumps(names: Iterable[str]) -> Iterator[tuple[str, Optional[int], Optional[str], Optional[str]]]:
+        common = Crashdump.get_common_exp()
+        seen: set[str] = set()
+        for name in names:
+            file = name.rsplit("/", 1)[-1]
+            if not common.match(file) or file in seen:
+                continue
+            seen.add(file)
+            try:
+                crashdump = Crashdump.from_filename(file)
+            except (ValueError, IndexError):
+                yield file, None, None, None
+                continue
+            yield file, ReportIndex._int(crashdump.get_revision().lstrip("r")), crashdump.get_game().value, crashdump.get_datetime().isoformat()
+
+
+    @staticmethod
+    def events(report: ReportReader, names: list[str]) -> Iterator[tuple]:
+        """Events streamed line by line from `events/events.xml`, or the per event members of older reports"""
+        if EventArchive.MEMBER in names:
+            with report.open(EventArchive.MEMBER) as stream:
+                for line in stream:
+                    if line.startswith(b"<Event ") or line.startswith(b"<Event>"):
+                        event = line.decode("utf-8")
+                        yield EventArchive.describe(event, 0, 0), event
+            return
+
+        for name in names:
+            if name.startswith("events/") and name.endswith(".xml"):
+                event = report.read(name).decode("utf-8")
+                yield EventArchive.describe(event, 0, 0), event
+
+
+    @staticmethod
+    def fault(event_id: Optional[int], event: str) -> tuple[Optional[str], Optional[str]]:
+        if event_id != ReportIndex.APPLICATION_ERROR:
+            return None, None
+        named = dict(ReportIndex.NAMED_DATA.findall(event))
+        if named:
+            return named.get("FaultingModuleName"), named.get("ExceptionCode")
+        data = ReportIndex.DATA.findall(event)
+        return (
+            data[ReportIndex.FAULTING_MODULE_POSITION] if len(data) > ReportIndex.FAULTING_MODULE_POSITION else None,
+            data[ReportIndex.EXCEPTION_CODE_POSITION] if len(data) > ReportIndex.EXCEPTION_CODE_POSITION else None,
+        )
+
+
+    def find(
+        self,
+        revision: Optional[int] = None,
+        game: Optional[str] = None,
+        fault_module: Optional[str] = None,
+        deviation: Optional[str] = None,
+        deviation_kind: Optional[str] = None,
+        crashed_after: Optional[str] = None,
+        crashed_before: Optional[str] = None,
+        gpu: Optional[str] = None,
+        limit: int = 100,
+    ) -> list[sqlite3.Row]:
+        """Reports matching every given filter, newest first. Module and file paths match case insensitively"""
+        conditions: list[str] = []
+        params: list[object] = []
+        if revision is not None:
+            conditions.append("r.revision = ?")
+            params.append(revision)
+        if game is not None:
+            conditions.append("r.game = ?")
+            params.append(game.lower()[:2])
+        if gpu is not None:
+            conditions.append("r.gpu LIKE ?")
+            params.append(f"%{gpu}%")
+        if fault_module is not None:
+            conditions.append("r.id IN (SELECT report_id FROM events WHERE fault_module = ? COLLATE NOCASE)")
+            params.append(fault_module)
+        if deviation is not None:
+            kinds = ("missing", "extra", "modified") if deviation_kind is None else (deviation_kind,)
+            conditions.append(f"r.id IN (SELECT report_id FROM hash_deviations WHERE path = ? COLLATE NOCASE AND kind IN ({', '.join('?' * len(kinds))}))")
+            params += [ReleaseManifest.key(deviation), *kinds]
+        if crashed_after is not None or crashed_before is not None:
+            conditions.append("r.id IN (SELECT report_id FROM crashdumps WHERE crashed_at >= ? AND crashed_at < ?)")
+            params += [crashed_after or "", crashed_before or "9999"]
+
+        query = (
+            "SELECT r.*, (SELECT MAX(crashed_at) FROM crashdumps WHERE report_id = r.id) AS crashed_at, "
+            "(SELECT GROUP_CONCAT(DISTINCT fault_module) FROM events WHERE report_id = r.id) AS fault_modules "
+            "FROM reports r"
+            + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+            + " ORDER BY r.created_at DESC LIMIT ?"
+        )
+        return self._db.execute(query, (*params, limit)).fetchall()
+
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "reports": self._db.execute("SELECT COUNT(*) FROM reports").fetchone()[0],
+            "events": self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            "revisions": {row[0]: row[1] for row in self._db.execute("SELECT revision, COUNT(*) FROM reports GROUP BY revision ORDER BY revision DESC")},
+            "games": {row[0]: row[1] for row in self._db.execute("SELECT game, COUNT(*) FROM reports GROUP BY game ORDER BY game")},
+            "fault_modules": {
+                row[0]: row[1] for row in self._db.execute(
+                    "SELECT fault_module, COUNT(DISTINCT report_id) AS reports FROM events WHERE fault_module IS NOT NULL "
+                    "GROUP BY fault_module COLLATE NOCASE ORDER BY reports DESC LIMIT 10"
+                )
+            },
+        }
+
+
+    @staticmethod
+    def _int(value: object) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,124 @@
+from pathlib import Path
+from typing import IO, Self
+from ParallelZipWriter import ParallelZipWriter
+from ReportVolumes import ReportVolumes
+import io, zipfile
+
+
+class ReportReader:
+    """
+    Reads a report as one archive, a single zip or every part of a size capped one, given any of its parts.
+    Members are looked up across the parts, a member split into pieces (marked by their entry comment) is listed
+    and read as the whole file, its pieces streamed one after another without extracting anything.
+    """
+
+    def __init__(self, path: Path):
+        self._parts: list[zipfile.ZipFile] = []
+        self._members: dict[str, list[tuple[zipfile.ZipFile, zipfile.ZipInfo]]] = {}
+        try:
+            for part in ReportVolumes.parts_of(path):
+                self._parts.append(zipfile.ZipFile(part))
+            last = self._parts[-1]
+            if ReportVolumes.PART.match(path.name) and last.comment != ReportVolumes.LAST_PART_COMMENT.format(index=len(self._parts)).encode():
+                raise ValueError(f"Report {path.name} is incomplete, parts after {Path(last.filename).name} are missing")
+            for part in self._parts:
+                for info in part.infolist():
+                    # Pieces are named `<member>.001`, `.002`, ... and follow each other in consecutive parts
+                    member = info.filename.rsplit(".", 1)[0] if info.comment == ReportVolumes.PIECE_COMMENT else info.filename
+                    self._members.setdefault(member, []).append((part, info))
+        except BaseException:
+            self.close()
+            raise
+
+
+    def __enter__(self) -> Self:
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+    def namelist(self) -> list[str]:
+        return list(self._members)
+
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        """Entry of a member, for a split one made up from its pieces, sizes and CRC-32 of the whole file"""
+        entries = self._entries(name)
+        if len(entries) == 1:
+            return entries[0][1]
+        info = zipfile.ZipInfo(name, entries[0][1].date_time)
+        info.compress_type = entries[0][1].compress_type
+        info.CRC = entries[0][1].CRC
+        for _, piece in entries[1:]:
+            info.CRC = ParallelZipWriter.crc32_combine(info.CRC, piece.CRC, piece.file_size)
+        info.file_size = sum(piece.file_size for _, piece in entries)
+        info.compress_size = sum(piece.compress_size for _, piece in entries)
+        return info
+
+
+    def infolist(self) -> list[zipfile.ZipInfo]:
+        return [self.getinfo(name) for name in self._members]
+
+
+    def open(self, name: str) -> IO[bytes]:
+        entries = self._entries(name)
+        if len(entries) == 1:
+            return entries[0][0].open(entries[0][1])
+        return io.BufferedReader(_Pieces(entries))
+
+
+    def read(self, name: str) -> bytes:
+        with self.open(name) as stream:
+            return stream.read()
+
+
+    def close(self) -> None:
+        for part in self._parts:
+            part.close()
+        self._parts = []
+
+
+    def _entries(self, name: str) -> list[tuple[zipfile.ZipFile, zipfile.ZipInfo]]:
+        entries = self._members.get(name)
+        if entries is None:
+            raise KeyError(f"There is no item named {name!r} in the report")
+        return entries
+
+
+
+class _Pieces(io.RawIOBase):
+    """The pieces of a split member read as one stream, each piece opened once the one before it is used up"""
+
+    def __init__(self, entries: list[tuple[zipfile.ZipFile, zipfile.ZipInfo]]):
+        self._entries = iter(entries)
+        self._current = None
+        self._next()
+
+
+    def readable(self) -> bool:
+        return True
+
+
+    def readinto(self, buffer) -> int:
+        while self._current is not None:
+            read = self._current.readinto(buffer)
+            if read:
+                return read
+            self._next()
+        return 0
+
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
+
+
+    def _next(self) -> None:
+        if self._current is not None:
+            self._current.close()
+        entry = next(self._entries, None)
+        self._current = entry[0].open(entry[1]) if entry is not None else None
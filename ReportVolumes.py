@@ -0,0 +1,165 @@
+from pathlib import Path
+from typing import Optional, Self
+from dto.CompressionPlanDTO import CompressionPlanDTO
+import re, zipfile
+
+
+class ReportVolumes:
+    """
+    The report archive, or with a size cap (`--max-volume-size`) a series of self-contained zips written one after
+    another, `b2-report-<time>.part01.zip`, `.part02.zip`, ... Every part opens on its own in any unzip tool.
+    A part is closed as soon as the next member does not fit into it, so the first parts can be sent while later ones
+    are still being compressed, and nothing beyond the members in flight is held in memory.
+
+    Members larger than a whole part are split by ParallelZipWriter into pieces `<member>.001`, `.002`, ...
+    in consecutive parts, the extracted pieces concatenated in order give back the file. Generated members (events,
+    manifest, general.json) are staged and then go through ParallelZipWriter too, so no part is ever larger than
+    the volume size. Pieces are marked by their entry comment and the last part by its archive comment, ReportReader
+    reads all parts back as one archive and tells when parts are missing.
+    """
+
+    PART = re.compile(r"^(?P<stem>.+)\.part(?P<index>\d+)\.zip$")
+    SIZE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?$", re.IGNORECASE)
+    UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    MIN_SIZE = 4 * 1024 * 1024
+    PIECE_COMMENT = b"b2-report piece"
+    PART_COMMENT = "b2-report part {index}"
+    LAST_PART_COMMENT = "b2-report part {index} of {index}"
+    # Central directory entry without the name, with room for a ZIP64 extra field and a piece comment
+    CENTRAL_ENTRY = 46 + 28 + 32
+    # End of central directory record, with room for the ZIP64 record and locator and the part comment
+    END_RECORDS = 22 + 56 + 20 + 64
+
+
+    def __init__(self, path: Path, max_size: Optional[int], plan: CompressionPlanDTO):
+        self._path = path
+        self._max_size = max_size
+        self._plan = plan
+        self._parts: list[Path] = []
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._central_size: int = 0
+        self._counted: int = 0
+        self._closed_members: dict[str, zipfile.ZipInfo] = {}
+        self._pieces: dict[str, list[tuple[zipfile.ZipInfo, int]]] = {}
+        self._open_next()
+
+
+    def __enter__(self) -> Self:
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+    @staticmethod
+    def parse_size(spec: str) -> int:
+        """`--max-volume-size` value, bytes or with a K, M or G (binary) suffix, eg. `25M`"""
+        match = ReportVolumes.SIZE.match(spec.strip())
+        assert match, f"Invalid volume size '{spec}', use eg. 25M"
+        size = int(float(match.group(1)) * ReportVolumes.UNITS[match.group(2).upper()])
+        assert size >= ReportVolumes.MIN_SIZE, f"Volume size must be at least {ReportVolumes.MIN_SIZE // 1024 // 1024}M"
+        return size
+
+
+    @staticmethod
+    def parts_of(path: Path) -> list[Path]:
+        """Every part of the report `path` is a part of, in order, or just `path` for a single archive"""
+        match = ReportVolumes.PART.match(path.name)
+        if match is None:
+            return [path]
+        parts: list[Path] = []
+        while (part := path.with_name(f"{match.group('stem')}.part{len(parts) + 1:02}.zip")).exists():
+            parts.append(part)
+        return parts or [path]
+
+
+    @staticmethod
+    def last_part(path: Path) -> Path:
+        return ReportVolumes.parts_of(path)[-1]
+
+
+    def is_capped(self) -> bool:
+        return self._max_size is not None
+
+
+    def get_archive(self) -> zipfile.ZipFile:
+        return self._archive
+
+
+    def get_parts(self) -> list[Path]:
+        return self._parts
+
+
+    def room(self, name: str) -> int:
+        """Bytes a member called `name` can still take in the current part, including its local header"""
+        archive = self._archive
+        for info in archive.filelist[self._counted:]:
+            self._central_size += ReportVolumes.CENTRAL_ENTRY + len(info.filename.encode()) + len(info.comment)
+        self._counted = len(archive.filelist)
+        return self._max_size - archive.fp.tell() - self._central_size - ReportVolumes.CENTRAL_ENTRY - len(name.encode()) - ReportVolumes.END_RECORDS
+
+
+    def capacity(self, name: str) -> int:
+        """Bytes a member called `name` can take in an empty part"""
+        return self._max_size - ReportVolumes.CENTRAL_ENTRY - len(name.encode()) - ReportVolumes.END_RECORDS
+
+
+    def ensure_room(self, size: int, name: str = "") -> zipfile.ZipFile:
+        """Current archive, after moving on to the next part if this one can not take `size` more bytes"""
+        if self.is_capped() and self._archive.filelist and self.room(name) < size:
+            self.rotate()
+        return self._archive
+
+
+    def rotate(self) -> None:
+        self._close_current()
+        part = self._parts[-1]
+        print(f"\tPart {len(self._parts)} ready to send: {part} ({part.stat().st_size / 1024 / 1024:.1f} MB)")
+        self._open_next()
+
+
+    def add_piece(self, member: str, piece: zipfile.ZipInfo) -> None:
+        piece.comment = ReportVolumes.PIECE_COMMENT
+        self._pieces.setdefault(member, []).append((piece, len(self._parts)))
+
+
+    def infos(self, member: str) -> list[zipfile.ZipInfo]:
+        """Entries of a member, the pieces in order for a split one"""
+        if member in self._pieces:
+            return [piece for piece, _ in self._pieces[member]]
+        info = self._archive.NameToInfo.get(member) or self._closed_members.get(member)
+        if info is None:
+            raise KeyError(f"There is no item named {member!r} in the report")
+        return [info]
+
+
+    def describe(self) -> Optional[dict]:
+        """Volume size for general.json, the parts are only all known once general.json itself was written"""
+        return {"max_size": self._max_size} if self.is_capped() else None
+
+
+    def close(self) -> None:
+        if self._archive is None:
+            return
+        if self.is_capped():
+            self._archive.comment = ReportVolumes.LAST_PART_COMMENT.format(index=len(self._parts)).encode()
+        self._close_current()
+        self._archive = None
+
+
+    def _open_next(self) -> None:
+        path = self._path
+        if self.is_capped():
+            path = path.with_name(f"{path.stem}.part{len(self._parts) + 1:02}.zip")
+        self._archive = zipfile.ZipFile(path, "x", compression=self._plan.compress_type, compresslevel=self._plan.compresslevel)
+        self._parts.append(path)
+        if self.is_capped():
+            self._archive.comment = ReportVolumes.PART_COMMENT.format(index=len(self._parts)).encode()
+        self._central_size = 0
+        self._counted = 0
+
+
+    def _close_current(self) -> None:
+        self._closed_members.update(self._archive.NameToInfo)
+        self._archive.close()
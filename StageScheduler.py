@@ -0,0 +1,172 @@
+from typing import Self, Optional
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from Tracer import Tracer
+import sys, io, threading
+
+
+class StageOutput(io.TextIOBase):
+    """
+    Replacement for `sys.stdout` that buffers writes per thread while a background stage is running,
+    so each stage's console output is printed as one block instead of interleaving with the others.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._local = threading.local()
+
+
+    def write(self, text: str) -> int:
+        buffer: Optional[list[str]] = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self._target.write(text)
+        buffer.append(text)
+        return len(text)
+
+
+    def flush(self) -> None:
+        self._target.flush()
+
+
+    def capture(self) -> None:
+        self._local.buffer = []
+
+
+    def release(self) -> str:
+        buffer: list[str] = self._local.buffer
+        self._local.buffer = None
+        return "".join(buffer)
+
+
+class StageScheduler:
+    """
+    Runs stages as soon as the stages they depend on have finished. Background stages run concurrently
+    on a thread pool with their output buffered and printed in one block once they finish. Interactive stages
+    run on the main thread with live output, output of background stages is held back while one is waiting for the user.
+    A failing stage does not abort the others, errors are collected and returned from `run`.
+    Stages that depend on a failed stage are skipped.
+    """
+
+    def __init__(self, workers: int = 4, sequential: bool = False):
+        self._workers = workers
+        self._sequential = sequential
+        self._stages: dict[str, tuple[Callable[[], object], tuple[str, ...], bool]] = {}
+        self._errors: dict[str, BaseException] = {}
+        self._finished: set[str] = set()
+
+
+    def add(self, name: str, stage: Callable[[], object], after: Iterable[str] = (), interactive: bool = False) -> Self:
+        assert name not in self._stages, f"Stage '{name}' is already registered"
+        self._stages[name] = (stage, tuple(after), interactive)
+        return self
+
+
+    def run(self) -> dict[str, BaseException]:
+        self._validate()
+        if self._sequential:
+            for name in self._stages:
+                self._run_inline(name)
+            return self._errors
+
+        output = StageOutput(sys.stdout)
+        sys.stdout = output
+        pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="stage")
+        running: dict[Future, str] = {}
+        pending: list[str] = list(self._stages)
+
+        try:
+            while pending or running:
+                interactive: Optional[str] = None
+                for name in [name for name in pending if self._is_ready(name)]:
+                    if self._stages[name][2]:
+                        if interactive is None:
+                            interactive = name
+                            pending.remove(name)
+                        continue
+                    pending.remove(name)
+                    if not self._skip_if_dependency_failed(name):
+                        running[pool.submit(StageScheduler._run_captured, output, name, self._stages[name][0])] = name
+
+                if interactive is not None:
+                    self._run_inline(interactive)
+                    continue
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    text, error = future.result()
+                    output.write(text)
+                    self._finish(name, error)
+        except BaseException:
+            # eg. SystemExit from an interactive stage, do not wait for background stages that are no longer needed
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            sys.stdout = output._target
+
+        pool.shutdown(wait=True)
+        return self._errors
+
+
+    def _validate(self) -> None:
+        for name, (_, after, _) in self._stages.items():
+            for dependency in after:
+                assert dependency in self._stages, f"Stage '{name}' depends on unknown stage '{dependency}'"
+
+        # Kahn's algorithm, anything left over is part of a cycle
+        remaining = {name: set(after) for name, (_, after, _) in self._stages.items()}
+        while True:
+            ready = [name for name, after in remaining.items() if not after]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for after in remaining.values():
+                after.difference_update(ready)
+        assert not remaining, f"Stage dependencies form a cycle: {', '.join(remaining)}"
+
+
+    def _is_ready(self, name: str) -> bool:
+        return all(dependency in self._finished for dependency in self._stages[name][1])
+
+
+    def _skip_if_dependency_failed(self, name: str) -> bool:
+        failed = [dependency for dependency in self._stages[name][1] if dependency in self._errors]
+        if not failed:
+            return False
+        self._finish(name, RuntimeError(f"skipped, depends on failed stage {', '.join(failed)}"))
+        return True
+
+
+    def _run_inline(self, name: str) -> None:
+        if self._skip_if_dependency_failed(name):
+            return
+        error: Optional[Exception] = None
+        try:
+            with Tracer.get().span(name, "stage"):
+                self._stages[name][0]()
+        except Exception as exc:
+            error = exc
+        self._finish(name, error)
+
+
+    def _finish(self, name: str, error: Optional[BaseException]) -> None:
+        self._finished.add(name)
+        if error is not None:
+            self._errors[name] = error
+            print(f"\tStage {name} failed: {error}")
+
+
+    @staticmethod
+    def _run_captured(output: StageOutput, name: str, stage: Callable[[], object]) -> tuple[str, Optional[BaseException]]:
+        output.capture()
+        error: Optional[BaseException] = None
+        try:
+            with Tracer.get().span(name, "stage"):
+                stage()
+        except BaseException as exc:
+            error = exc
+        return output.release(), error
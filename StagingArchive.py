@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import IO, Self
+import tempfile, zipfile
+
+
+class StagingArchive:
+    """
+    Stands in for the report archive while the generated members (events, hash sidecar, manifest, general.json) of a
+    size capped report are written. Every member goes to a temporary file of its own, ParallelZipWriter then adds
+    them to the parts like collected files, into a part with room left or split across parts when larger than one.
+    Directory entries are left out, the member paths imply them, and sizes are of the uncompressed member.
+    """
+
+    def __init__(self):
+        self._dir = tempfile.TemporaryDirectory(prefix="b2-report-")
+        self._members: dict[str, Path] = {}
+
+
+    def __enter__(self) -> Self:
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+    def open(self, name: str, mode: str = "r", **_) -> IO[bytes]:
+        assert mode == "w", "Staged members can only be written"
+        path = Path(self._dir.name) / f"{len(self._members)}.tmp"
+        self._members[name] = path
+        return path.open("wb")
+
+
+    def writestr(self, name: str, data: str | bytes) -> None:
+        with self.open(name, "w") as stream:
+            stream.write(data.encode("utf-8") if isinstance(data, str) else data)
+
+
+    def mkdir(self, name: str) -> None:
+        pass
+
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo.from_file(self._members[name], name)
+        info.compress_size = info.file_size
+        return info
+
+
+    def members(self) -> list[tuple[Path, str]]:
+        """Staged files and their member names, in the order they were written"""
+        return [(path, name) for name, path in self._members.items()]
+
+
+    def close(self) -> None:
+        self._dir.cleanup()
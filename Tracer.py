@@ -0,0 +1,172 @@
+from pathlib import Path
+from typing import Self, Optional
+from collections.abc import Iterator, Iterable
+import os, sys, json, time, threading
+
+
+class Span:
+    __slots__ = ("name", "category", "thread", "start_ns", "cpu_start_ns", "wall_ns", "cpu_ns", "counters", "args")
+
+    def __init__(self, name: str, category: str, args: Optional[dict] = None):
+        self.name = name
+        self.category = category
+        self.thread = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.cpu_start_ns = time.thread_time_ns()
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.counters: dict[str, int] = {}
+        self.args = args
+
+
+    def __enter__(self) -> Self:
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        Tracer.get().end(self)
+
+
+    def add(self, files: int = 0, bytes_read: int = 0, bytes_written: int = 0) -> Self:
+        for counter, value in (("files", files), ("bytes_read", bytes_read), ("bytes_written", bytes_written)):
+            if value:
+                self.counters[counter] = self.counters.get(counter, 0) + value
+        return self
+
+
+class Tracer:
+    """
+    Records wall time, CPU time of the recording thread and I/O counters for every stage and sub-step of a run.
+    Spans are aggregated into the `timings` section of general.json and can be exported in Chrome trace-event format
+    (chrome://tracing, https://ui.perfetto.dev). Individual spans are only kept with `--trace`, otherwise they are added
+    into their per name and category totals as they end, so per file spans cost nothing for the rest of the run.
+    """
+
+    _instance: Optional["Tracer"] = None
+
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+        self._totals: dict[tuple[str, str], dict] = {}
+        self._keep_spans: bool = "--trace" in sys.argv
+        self._origin_ns = time.perf_counter_ns()
+
+
+    @classmethod
+    def get(cls) -> "Tracer":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+
+    def begin(self, name: str, category: str = "step", **args) -> Span:
+        return Span(name, category, args or None)
+
+
+    def end(self, span: Span) -> Span:
+        span.wall_ns = time.perf_counter_ns() - span.start_ns
+        # thread_time_ns is per thread, spans ending on another thread only get their wall time
+        if span.thread == threading.get_ident():
+            span.cpu_ns = time.thread_time_ns() - span.cpu_start_ns
+        self._record(span)
+        return span
+
+
+    def span(self, name: str, category: str = "step", **args) -> Span:
+        """Span ended when its `with` block is left, cheaper than a generator based context manager for per file spans"""
+        return self.begin(name, category, **args)
+
+
+    def timed_iter(self, iterable: Iterable, name: str, category: str = "step", **args) -> Iterator:
+        """Wraps an iterator and records only the time spent producing items, not the time the consumer spends on them"""
+        span = self.begin(name, category, **args)
+        iterator = iter(iterable)
+        try:
+            while True:
+                start_ns, cpu_start_ns = time.perf_counter_ns(), time.thread_time_ns()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    span.wall_ns += time.perf_counter_ns() - start_ns
+                    span.cpu_ns += time.thread_time_ns() - cpu_start_ns
+                span.add(files=1)
+                yield item
+        finally:
+            self._record(span)
+
+
+    def timings(self) -> list[dict]:
+        with self._lock:
+            spans = list(self._spans)
+            aggregated = {key: dict(total) for key, total in self._totals.items()}
+
+        for span in spans:
+            Tracer._add_to(aggregated, span)
+
+        return [{
+            "name": entry["name"],
+            "category": entry["category"],
+            "count": entry["count"],
+            "wall_ms": round(entry["wall_ns"] / 1e6, 3),
+            "cpu_ms": round(entry["cpu_ns"] / 1e6, 3),
+            "files": entry["files"],
+            "bytes_read": entry["bytes_read"],
+            "bytes_written": entry["bytes_written"],
+        } for entry in aggregated.values()]
+
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            if self._keep_spans:
+                self._spans.append(span)
+            else:
+                Tracer._add_to(self._totals, span)
+
+
+    @staticmethod
+    def _add_to(aggregated: dict[tuple[str, str], dict], span: Span) -> None:
+        entry = aggregated.get((span.category, span.name))
+        if entry is None:
+            entry = aggregated[(span.category, span.name)] = {
+                "name": span.name,
+                "category": span.category,
+                "count": 0,
+                "wall_ns": 0,
+                "cpu_ns": 0,
+                "files": 0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+            }
+        entry["count"] += 1
+        entry["wall_ns"] += span.wall_ns
+        entry["cpu_ns"] += span.cpu_ns
+        for counter, value in span.counters.items():
+            entry[counter] += value
+
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        with self._lock:
+            spans = list(self._spans)
+
+        pid = os.getpid()
+        events = []
+        for span in sorted(spans, key=lambda span: span.start_ns):
+            args = dict(span.args or {})
+            args.update(span.counters)
+            args["cpu_ms"] = round(span.cpu_ns / 1e6, 3)
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start_ns - self._origin_ns) / 1000,
+                "dur": span.wall_ns / 1000,
+                "pid": pid,
+                "tid": span.thread,
+                "args": args,
+            })
+
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str), encoding="utf-8")
+        return path
@@ -1,21 +1,26 @@
 import win32evtlog
 import datetime as dt
-import xml.etree.ElementTree as XML
+import re
 from pathlib import Path
 from typing import Optional
+from collections.abc import Iterator
+from Tracer import Tracer
 
 
 class WindowsEventLog:
     EVENT_IDS = (1000, 1001, 1002)
+    BATCH_SIZE = 256
 
 
     def __init__(self, path_filter: Optional[Path] = None, alltime_events: bool = False, datetime: Optional[dt.datetime] = None):
-        self._path_filter = str(path_filter).lower() if path_filter else None
+        # EvtQuery XPath has no substring functions, so the path is matched on the rendered XML,
+        # case insensitive without lowercasing a copy of every event
+        self._path_filter = re.compile(re.escape(str(path_filter)), re.IGNORECASE) if path_filter else None
         self._alltime_events = alltime_events
         self._datetime = datetime
 
 
-    def collect(self) -> list[XML.Element]:
+    def query(self) -> str:
         start_time = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=14)
         iso_time = start_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
 
@@ -23,50 +28,59 @@ class WindowsEventLog:
             f"EventID={eid}" for eid in WindowsEventLog.EVENT_IDS
         )
 
-        time_query = f"and TimeCreated[@SystemTime >= '{iso_time}'"
+        time_query = f" and TimeCreated[@SystemTime >= '{iso_time}']"
         if self._alltime_events:
             time_query = ""
         elif self._datetime:
-            time_query = f"and TimeCreated[@SystemTime >= '{self._datetime.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT00:00:00.000Z")}' and @SystemTime < '{(self._datetime + dt.timedelta(days=1)).astimezone(dt.timezone.utc).strftime("%Y-%m-%dT00:00:00.000Z")}'"
+            day_start = self._datetime.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT00:00:00.000Z")
+            day_end = (self._datetime + dt.timedelta(days=1)).astimezone(dt.timezone.utc).strftime("%Y-%m-%dT00:00:00.000Z")
+            time_query = f" and TimeCreated[@SystemTime >= '{day_start}' and @SystemTime < '{day_end}']"
 
-        query = f"""
-        *[System[
-            ({eventid_filter})
-            {time_query}]
-        ]]
-        """
-
-        handle = win32evtlog.EvtQuery(
-            "Application",
-            win32evtlog.EvtQueryReverseDirection,
-            query,
-        )
-
-        results: list[XML.Element] = []
-
-        while True:
-            try:
-                events = win32evtlog.EvtNext(handle, 16)
-            except Exception:
-                break
+        return f"*[System[({eventid_filter}){time_query}]]"
 
-            if not events:
-                break
 
-            for event in events:
+    def collect(self) -> Iterator[str]:
+        """
+        Runs the query right away and returns an iterator over the rendered event XML, newest first.
+        Events are read and rendered as the iterator is consumed, so they can be streamed into the report
+        without being held in memory.
+        """
+        with Tracer.get().span("evtlog.query", "collector"):
+            handle = win32evtlog.EvtQuery(
+                "Application",
+                win32evtlog.EvtQueryReverseDirection,
+                self.query(),
+            )
+        return self._read(handle)
+
+
+    def _read(self, handle) -> Iterator[str]:
+        span = Tracer.get().begin("evtlog.read", "collector")
+        try:
+            while True:
                 try:
-                    raw = win32evtlog.EvtRender(
-                        event, win32evtlog.EvtRenderEventXml
-                    )
+                    events = win32evtlog.EvtNext(handle, WindowsEventLog.BATCH_SIZE)
                 except Exception:
-                    continue
-
-                if self._path_filter and self._path_filter not in raw.lower():
-                    continue
-
-                results.append(XML.fromstring(raw))
-
-        return results
+                    break
+
+                if not events:
+                    break
+
+                for event in events:
+                    try:
+                        raw = win32evtlog.EvtRender(
+                            event, win32evtlog.EvtRenderEventXml
+                        )
+                    except Exception:
+                        continue
+
+                    if self._path_filter and not self._path_filter.search(raw):
+                        continue
+
+                    span.add(bytes_read=len(raw))
+                    yield raw
+        finally:
+            Tracer.get().end(span)
 
 
     def _extract_attr(self, xml: str, tag: str, attr: str) -> str | None:
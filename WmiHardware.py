@@ -0,0 +1,154 @@
+from abc import abstractmethod
+from collections.abc import Callable
+from AbstractHardware import AbstractHardware
+from dto.HadwareDTO import HardwareDTO
+from Tracer import Tracer
+import time, threading
+
+
+class WmiHardware(AbstractHardware):
+    """
+    Hardware report from WMI with projected queries, so only the properties that end up in the report are fetched.
+    The probes run concurrently, each on its own thread with its own connection, and every probe gets `timeout` seconds.
+    A probe that does not finish in time (eg. a hung WMI provider) is reported empty and left behind on a daemon thread.
+
+    Subclasses provide the connection and per-thread setup, `HardwareWindows` for the real WMI.
+    """
+
+    PROBE_TIMEOUT = 15.0
+    QUERIES = {
+        "cpu": "SELECT Name, NumberOfCores, NumberOfLogicalProcessors, MaxClockSpeed, Manufacturer FROM Win32_Processor",
+        "gpu": "SELECT Name, DriverVersion, AdapterRAM, VideoProcessor, PNPDeviceID FROM Win32_VideoController",
+        "ram": "SELECT Capacity, Speed, Manufacturer, PartNumber FROM Win32_PhysicalMemory",
+        "os": "SELECT Caption, Version, BuildNumber, OSArchitecture FROM Win32_OperatingSystem",
+    }
+
+
+    def __init__(self, timeout: float = PROBE_TIMEOUT):
+        self._timeout = timeout
+        self._local = threading.local()
+
+
+    def report(self) -> HardwareDTO:
+        probes: dict[str, tuple[str, Callable[[], object], object]] = {
+            "cpu": ("wmi.cpu", self.cpu, []),
+            "gpu": ("wmi.gpu", self.gpu, []),
+            "ram": ("wmi.ram", self.ram, []),
+            "os": ("wmi.os", self.os, {}),
+            "display": ("display", self.display, []),
+        }
+        results: dict[str, object] = {}
+        threads = {
+            name: threading.Thread(target=self._run_probe, args=(name, span, probe, results), name=f"hardware-{name}", daemon=True)
+            for name, (span, probe, _) in probes.items()
+        }
+        for thread in threads.values():
+            thread.start()
+
+        deadline = time.monotonic() + self._timeout
+        for name, thread in threads.items():
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if name not in results:
+                print(f"Could not collect hardware data [{name.upper()}] with error timed out after {self._timeout:g}s")
+
+        return HardwareDTO(*(results.get(name, default) for name, (_, _, default) in probes.items()))
+
+
+    def _run_probe(self, name: str, span: str, probe: Callable[[], object], results: dict[str, object]) -> None:
+        self._initialize_thread()
+        try:
+            with Tracer.get().span(span, "collector"):
+                results[name] = probe()
+        finally:
+            self._uninitialize_thread()
+
+
+    def _query(self, probe: str) -> list:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            with Tracer.get().span("wmi.connect", "collector"):
+                connection = self._local.connection = self._connect()
+        return connection.query(WmiHardware.QUERIES[probe])
+
+
+    # Opens a connection for the calling thread, connections are not shared between threads
+    @abstractmethod
+    def _connect(self) -> object: ...
+
+
+    def _initialize_thread(self) -> None:
+        pass
+
+
+    def _uninitialize_thread(self) -> None:
+        self._local.connection = None
+
+
+    def cpu(self) -> list[dict[str, str]]:
+        try:
+            return [
+                {
+                    "name": cpu.Name,
+                    "cores": cpu.NumberOfCores,
+                    "logical_processors": cpu.NumberOfLogicalProcessors,
+                    "max_clock_mhz": cpu.MaxClockSpeed,
+                    "manufacturer": cpu.Manufacturer,
+                }
+            for cpu in self._query("cpu")]
+        except Exception as exc:
+            print(f"Could not collect hardware data [CPU] with error {exc}")
+            return []
+
+
+    def gpu(self) -> list[dict[str, object]]:
+        try:
+            gpus = []
+
+            for gpu in self._query("gpu"):
+                vram = None
+                if gpu.AdapterRAM is not None:
+                    vram = gpu.AdapterRAM & 0xFFFFFFFF
+
+                gpus.append({
+                    "name": gpu.Name,
+                    "driver_version": gpu.DriverVersion,
+                    "video_ram_bytes": vram,
+                    "video_processor": gpu.VideoProcessor,
+                    "pnp_device_id": gpu.PNPDeviceID,
+                })
+
+            return gpus
+
+        except Exception as exc:
+            print(f"Could not collect hardware data [GPU] with error {exc}")
+            return []
+
+
+    def ram(self) -> list[dict[str, str]]:
+        try:
+            return [
+                {
+                    "capacity_bytes": mem.Capacity,
+                    "speed_mhz": mem.Speed,
+                    "manufacturer": mem.Manufacturer,
+                    "part_number": mem.PartNumber.strip(),
+                }
+                for mem in self._query("ram")
+            ]
+        except Exception as exc:
+            print(f"Could not collect hardware data [RAM] with error {exc}")
+            return []
+
+
+    def os(self) -> dict[str, str]:
+        try:
+            sys = self._query("os")[0]
+            return {
+                "name": sys.Caption,
+                "version": sys.Version,
+                "build_number": sys.BuildNumber,
+                "architecture": sys.OSArchitecture,
+            }
+        except Exception as exc:
+            print(f"Could not collect hardware data [OS] with error {exc}")
+            return {}
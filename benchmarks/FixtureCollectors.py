@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import Optional
+from AbstractHardware import AbstractHardware
+from PowerSettings import PowerSettings
+from WmiHardware import WmiHardware
+from dto.HadwareDTO import HardwareDTO
+from collections.abc import Iterator
+from types import SimpleNamespace
+import re, json, time, datetime as dt
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FixtureHardware(AbstractHardware):
+    """Stand-in for HardwareWindows that reports a captured machine"""
+
+    def __init__(self):
+        self._data = json.loads((FIXTURES / "hardware.json").read_text(encoding="utf-8"))
+
+    def report(self) -> HardwareDTO:
+        return HardwareDTO(self.cpu(), self.gpu(), self.ram(), self.os(), self.display())
+
+    def fingerprint(self) -> dict[str, object]:
+        return {
+            "os_build": self._data["os"]["build_number"],
+            "gpu_drivers": [[gpu["name"], gpu["driver_version"]] for gpu in self._data["gpu"]],
+            "displays": [[monitor["device_string"], monitor["width"], monitor["height"], monitor["refresh_rate"]] for monitor in self._data["display"]],
+        }
+
+    def cpu(self) -> list[dict[str, str]]:
+        return self._data["cpu"]
+
+    def gpu(self) -> list[dict[str, str]]:
+        return self._data["gpu"]
+
+    def ram(self) -> list[dict[str, str]]:
+        return self._data["ram"]
+
+    def os(self) -> dict[str, str]:
+        return self._data["os"]
+
+    def display(self) -> list[dict[str, str]]:
+        return self._data["display"]
+
+
+class FixtureWmi:
+    """
+    In-memory WMI backend answering `SELECT <properties> FROM <class>` from fixtures/wmi.json. Rows only carry
+    the selected properties, like projected WMI queries, and `DELAYS` holds seconds to sleep per class to simulate
+    slow or hung providers.
+    """
+
+    QUERY = re.compile(r"SELECT (.+) FROM (\w+)", re.IGNORECASE)
+    DELAYS: dict[str, float] = {}
+
+    def __init__(self):
+        self._classes: dict[str, list[dict]] = json.loads((FIXTURES / "wmi.json").read_text(encoding="utf-8"))
+
+    def query(self, wql: str) -> list[SimpleNamespace]:
+        properties, wmi_class = FixtureWmi.QUERY.match(wql).groups()
+        time.sleep(FixtureWmi.DELAYS.get(wmi_class, 0.0))
+        if properties.strip() == "*":
+            return [SimpleNamespace(**row) for row in self._classes[wmi_class]]
+        selected = [prop.strip() for prop in properties.split(",")]
+        return [SimpleNamespace(**{prop: row.get(prop) for prop in selected}) for row in self._classes[wmi_class]]
+
+
+class FixtureWmiHardware(WmiHardware):
+    """WmiHardware over `FixtureWmi`, exercises the concurrent probes and timeouts of the real collector"""
+
+    def _connect(self) -> FixtureWmi:
+        return FixtureWmi()
+
+    def fingerprint(self) -> dict[str, object]:
+        return FixtureHardware().fingerprint()
+
+    def display(self) -> list[dict[str, str]]:
+        return FixtureHardware().display()
+
+
+class FixtureEventLog:
+    """Stand-in for WindowsEventLog, returns captured events repeated `REPEAT` times"""
+
+    REPEAT = 1
+
+    def __init__(self, path_filter: Optional[Path] = None, alltime_events: bool = False, datetime: Optional[dt.datetime] = None):
+        self._raw = [line for line in (FIXTURES / "events.xml").read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def collect(self) -> Iterator[str]:
+        for _ in range(FixtureEventLog.REPEAT):
+            yield from self._raw
+
+
+class FixturePowerSettings(PowerSettings):
+    """Stand-in for PowerSettings, parses captured `powercfg /query` output instead of running it"""
+
+    FIXTURE = FIXTURES / "powercfg.txt"
+
+    def _stream_powercfg(self) -> Iterator[str]:
+        with FixturePowerSettings.FIXTURE.open(encoding="utf-8") as fh:
+            yield from fh
@@ -0,0 +1,162 @@
+from pathlib import Path
+from typing import Self
+import os, dataclasses, datetime as dt, json, random, struct
+
+
+@dataclasses.dataclass
+class SyntheticTreeConfig:
+    bin_files: int = 40
+    bin_size: int = 512 * 1024
+    game_files: int = 6
+    game_size: int = 8 * 1024 * 1024
+    launcher_files: int = 30
+    plugin_files: int = 5
+    storage_files: int = 200
+    storage_size: int = 16 * 1024
+    logs_per_game: int = 8
+    log_lines: int = 20000
+    configs_per_game: int = 4
+    mods_per_game: int = 3
+    demos_per_game: int = 500
+    demo_size: int = 64 * 1024
+    crashdumps: int = 30
+    crashdump_size: int = 4 * 1024 * 1024
+    minidump_size: int = 256 * 1024
+
+
+class SyntheticTree:
+    """
+    Builds a fake Plutonium root with a realistic layout: bin/games/launcher/plugins binaries, storage/t4-t6
+    with console logs, configs, mods and demos, and crashdumps named `plutonium-rNNNN-tXX-date` with their
+    full, minimal and txt variants. Output is deterministic for a given seed.
+    """
+
+    GAMES = {"t4": ("t4sp", "t4mp"), "t5": ("t5sp", "t5mp"), "t6": ("t6zm", "t6mp")}
+    CONSOLE_LOGS = {"t4": "console.log", "t5": "console.log", "t6": "console_zm.log"}
+    LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+    def __init__(self, root: Path, config: SyntheticTreeConfig = SyntheticTreeConfig(), seed: int = 1):
+        self._root = root
+        self._config = config
+        self._random = random.Random(seed)
+        self._now = dt.datetime(2026, 10, 1, 12, 0, 0)
+
+
+    def generate(self) -> Self:
+        cfg = self._config
+        self._root.mkdir(parents=True, exist_ok=True)
+        (self._root / "info.json").write_text(json.dumps({"revision": 4516, "updated_at": self._now.isoformat()}))
+
+        self._binaries(self._root / "bin", cfg.bin_files, cfg.bin_size, ".dll")
+        self._binaries(self._root / "games", cfg.game_files, cfg.game_size, ".exe")
+        self._binaries(self._root / "launcher", cfg.launcher_files, 32 * 1024, ".js")
+        self._binaries(self._root / "plugins", cfg.plugin_files, 128 * 1024, ".dll")
+        self._binaries(self._root / "storage" / "shared", cfg.storage_files, cfg.storage_size, ".ff")
+
+        for game in SyntheticTree.GAMES:
+            self._storage_for(game)
+
+        self._crashdumps(self._root / "crashdumps")
+        return self
+
+
+    def get_root(self) -> Path:
+        return self._root
+
+
+    def _binaries(self, path: Path, count: int, size: int, suffix: str) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        for i in range(count):
+            # Half random, half repetitive, so the files compress roughly like real binaries
+            half = size // 2
+            (path / f"file{i:04d}{suffix}").write_bytes(self._random.randbytes(half) + SyntheticTree._pattern(size - half))
+
+
+    @staticmethod
+    def _pattern(size: int) -> bytes:
+        return (bytes(range(256)) * (size // 256 + 1))[:size]
+
+
+    def _storage_for(self, game: str) -> None:
+        cfg = self._config
+        main = self._root / "storage" / game / "main"
+        main.mkdir(parents=True, exist_ok=True)
+
+        console_log = SyntheticTree.CONSOLE_LOGS[game]
+        for i in range(cfg.logs_per_game):
+            name = console_log if i == 0 else f"{console_log}.{i}"
+            self._log(main / name, self._now - dt.timedelta(days=i))
+        self._log(main / "games_mp.log", self._now)
+
+        players = self._root / "storage" / game / "players"
+        players.mkdir(parents=True, exist_ok=True)
+        for i in range(cfg.configs_per_game):
+            (players / f"config{i}.cfg").write_text("\n".join(f'seta var{n} "{self._random.randint(0, 100)}"' for n in range(300)))
+        if game == "t5":
+            (players / "competitive-t5.json").write_text(json.dumps({"enabled": True}))
+
+        for i in range(cfg.mods_per_game):
+            mod = self._root / "storage" / game / "mods" / f"mod{i}"
+            mod.mkdir(parents=True, exist_ok=True)
+            (mod / "mod.ff").write_bytes(self._random.randbytes(64 * 1024))
+            self._log(mod / "console.log", self._now)
+
+        demos = main / "demos"
+        demos.mkdir(parents=True, exist_ok=True)
+        for i in range(cfg.demos_per_game):
+            (demos / f"demo{i:05d}.demo").write_bytes(self._random.randbytes(cfg.demo_size))
+
+
+    def _log(self, path: Path, end: dt.datetime) -> None:
+        lines = self._config.log_lines
+        start = end - dt.timedelta(hours=6)
+        step = (end - start) / max(1, lines)
+        with path.open("w", encoding="utf-8") as fh:
+            for i in range(lines):
+                timestamp = (start + step * i).strftime(SyntheticTree.LOG_TIME_FORMAT)
+                fh.write(f"[{timestamp}] Script {self._random.choice(('info', 'warning', 'notice'))}: message {i} from {path.name}\n")
+        # Rotated logs were last written when their session ended
+        os.utime(path, (end.timestamp(), end.timestamp()))
+
+
+    def _crashdumps(self, path: Path) -> None:
+        cfg = self._config
+        path.mkdir(parents=True, exist_ok=True)
+        for i in range(cfg.crashdumps):
+            game = self._random.choice([mode for modes in SyntheticTree.GAMES.values() for mode in modes])
+            revision = self._random.choice((4516, 4522, 4550))
+            when = (self._now - dt.timedelta(hours=7 * i)).strftime("%Y-%m-%d_%H-%M-%S")
+            common = f"plutonium-r{revision}-{game}-{when}"
+            header = self._minidump(game, self._now - dt.timedelta(hours=7 * i))
+            (path / f"{common}.dmp").write_bytes(header + self._random.randbytes(cfg.crashdump_size // 4) + bytes(max(0, cfg.crashdump_size - cfg.crashdump_size // 4 - len(header))))
+            (path / f"{common}-minimal.dmp").write_bytes(header + self._random.randbytes(max(0, cfg.minidump_size - len(header))))
+            (path / f"{common}.txt").write_text(f"Exception code: 0xC0000005\nGame: {game}\nRevision: r{revision}\n")
+
+
+    def _minidump(self, game: str, when: dt.datetime) -> bytes:
+        """Minidump header with system info, exception, thread list and module list streams, the rest is up to the caller"""
+        modules = [(f"C:\\Plutonium\\games\\{game}.exe", 0x00400000, 0x02000000), ("C:\\Plutonium\\bin\\plutonium-bootstrapper-win32.exe", 0x10000000, 0x00800000)]
+        modules += [(f"C:\\Windows\\System32\\lib{i}.dll", 0x70000000 + i * 0x00100000, 0x00080000) for i in range(30)]
+        threads = 24
+
+        system_rva, exception_rva, threads_rva = 80, 136, 304
+        modules_rva = threads_rva + 4 + threads * 48
+        names_rva = modules_rva + 4 + len(modules) * 108
+
+        out = bytearray(struct.pack("<4sIIIIIQ", b"MDMP", 0xA793, 4, 32, 0, int(when.timestamp()), 0))
+        for stream, rva, size in ((7, system_rva, 56), (6, exception_rva, 168), (3, threads_rva, modules_rva - threads_rva), (4, modules_rva, names_rva - modules_rva)):
+            out += struct.pack("<III", stream, size, rva)
+        out += struct.pack("<HHHBBIIII", 0, 6, 0x9E0A, 8, 1, 10, 0, 19045, 2).ljust(56, b"\0")
+        address = 0x00400000 + self._random.randrange(0x02000000)
+        out += struct.pack("<IIIIQQII", 1000, 0, 0xC0000005, 0, 0, address, 2, 0).ljust(168, b"\0")
+        out += struct.pack("<I", threads)
+        for i in range(threads):
+            out += struct.pack("<IIIIQQIIII", 1000 + i * 4, 0, 32, 0, 0x7EFDD000 - i * 0x3000, 0x0019F000 + i * 0x100000, 0, 0, 0, 0)
+        out += struct.pack("<I", len(modules))
+        names = bytearray()
+        for name, base, size in modules:
+            out += struct.pack("<QIIII", base, size, 0, int(when.timestamp()), names_rva + len(names)).ljust(108, b"\0")
+            encoded = name.encode("utf-16-le")
+            names += struct.pack("<I", len(encoded)) + encoded + b"\0\0"
+        return bytes(out + names)
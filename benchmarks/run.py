@@ -0,0 +1,333 @@
+"""
+Benchmarks for the hot paths of the reporter, run against a synthetic Plutonium tree.
+Windows collectors are replaced with fixture backed stand-ins, so the suite runs on any platform.
+
+    python benchmarks/run.py [--preset small|default|large] [--repeat N] [--output results.json]
+                             [--baseline results.json] [--tolerance 0.25] [--keep-tree PATH]
+
+Exits with 1 when a benchmark exceeds its threshold from thresholds.json, or when it is slower than
+the baseline results by more than the tolerance.
+"""
+from pathlib import Path
+from collections.abc import Callable
+import sys, os, io, json, time, shutil, atexit, zipfile, argparse, builtins, tempfile, statistics, contextlib
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from SyntheticTree import SyntheticTree, SyntheticTreeConfig
+from App import App
+from Plutonium import Plutonium
+from CrashdumpIndex import CrashdumpIndex
+
+
+PRESETS: dict[str, SyntheticTreeConfig] = {
+    "small": SyntheticTreeConfig(bin_files=20, bin_size=128 * 1024, game_files=2, game_size=2 * 1024 * 1024, storage_files=50,
+                                 logs_per_game=3, log_lines=2000, demos_per_game=100, demo_size=4 * 1024, crashdumps=10,
+                                 crashdump_size=1024 * 1024, minidump_size=64 * 1024),
+    "default": SyntheticTreeConfig(),
+    "large": SyntheticTreeConfig(bin_files=400, storage_files=5000, logs_per_game=20, log_lines=100000, demos_per_game=5000,
+                                 crashdumps=2000, crashdump_size=8 * 1024 * 1024, minidump_size=512 * 1024),
+}
+
+
+def make_app(root: Path, *flags: str) -> App:
+    sys.argv = ["bench", "--collectors", "hardware,events,power", *flags]
+    app = App("bench")
+    app._collectors.register("hardware", "FixtureCollectors", "FixtureHardware")
+    app._collectors.register("events", "FixtureCollectors", "FixtureEventLog")
+    app._collectors.register("power", "FixtureCollectors", "FixturePowerSettings")
+    app._plutonium.set_root(root)
+    return app
+
+
+def prepared_app(root: Path, *flags: str) -> App:
+    """App with everything collected, ready for compose_report"""
+    app = make_app(root, *flags)
+    os.chdir(root)
+    (app.set_plutonium_path()
+        .collect_relevant_logs()
+        .collect_configs()
+        .collect_file_hashes()
+        .collect_hardware_data()
+        .collect_event_log_entries()
+        .collect_power_settings()
+        .collect_crashdump_summaries()
+    )
+    return app
+
+
+def bench_dir_iterator(root: Path) -> Callable[[], object]:
+    return lambda: sum(1 for _ in Plutonium.dir_iterator(root / "storage", Plutonium.is_static_file, Plutonium.is_excluded_dir))
+
+
+def bench_get_hashes(root: Path) -> Callable[[], object]:
+    plutonium = Plutonium().set_root(root)
+    files = sorted((root / "games").iterdir())
+    return lambda: [plutonium.get_hashes(file) for file in files]
+
+
+def bench_collect_file_hashes_cold(root: Path) -> Callable[[], object]:
+    return lambda: make_app(root, "--no-hash-cache").collect_file_hashes()
+
+
+def bench_collect_file_hashes_warm(root: Path) -> Callable[[], object]:
+    make_app(root).collect_file_hashes()
+    return lambda: make_app(root).collect_file_hashes()
+
+
+def bench_parse_powercfg(root: Path) -> Callable[[], object]:
+    from FixtureCollectors import FixturePowerSettings
+    # Expected output was captured from the previous multi-pass parser
+    expected = json.loads((BENCHMARKS_DIR / "fixtures" / "powercfg.json").read_text(encoding="utf-8"))
+    parsed = FixturePowerSettings().collect().parsed
+    assert parsed == expected, "Parsed powercfg output does not match fixtures/powercfg.json"
+
+    lines = FixturePowerSettings.FIXTURE.read_text(encoding="utf-8").splitlines()
+    return lambda: [FixturePowerSettings()._parse_lines(lines) for _ in range(200)]
+
+
+def bench_hardware_probes(root: Path) -> Callable[[], object]:
+    from FixtureCollectors import FixtureHardware, FixtureWmi, FixtureWmiHardware
+    # Projected queries have to produce the same report as the captured one
+    FixtureWmi.DELAYS = {}
+    assert FixtureWmiHardware().report() == FixtureHardware().report(), "WMI report does not match fixtures/hardware.json"
+
+    # A hung provider only costs the probe timeout, the other probes still report
+    FixtureWmi.DELAYS = {"Win32_PhysicalMemory": 5.0}
+    start = time.perf_counter()
+    report = FixtureWmiHardware(timeout=0.2).report()
+    assert time.perf_counter() - start < 1.0 and report.ram == [] and report.cpu, "Hung WMI probe was not timed out"
+
+    # Every provider takes 50ms, probes running one after another would take 200ms
+    FixtureWmi.DELAYS = {wmi_class: 0.05 for wmi_class in ("Win32_Processor", "Win32_VideoController", "Win32_PhysicalMemory", "Win32_OperatingSystem")}
+    return lambda: FixtureWmiHardware().report()
+
+
+def bench_window_logs(root: Path) -> Callable[[], object]:
+    os.chdir(root)
+
+    def run():
+        app = make_app(root, "--log-window", "30")
+        app.set_plutonium_path().collect_relevant_logs()
+        assert app._log_window["windows"], "No log was narrowed to the crash window"
+    return run
+
+
+def bench_summarize_crashdumps(root: Path) -> Callable[[], object]:
+    from Minidump import Minidump
+    dumps = sorted((root / "crashdumps").glob("*.dmp"))
+
+    def run():
+        summaries = [Minidump(dump).summary() for dump in dumps]
+        assert all(summary.faulting_module for summary in summaries), "Faulting module was not found in a synthetic dump"
+    return run
+
+
+def bench_select_crashdump(root: Path) -> Callable[[], object]:
+    def run():
+        index = CrashdumpIndex(root / "crashdumps").build()
+        make_app(root)._select_crashdump()
+        return index
+    return run
+
+
+def bench_compose_report(root: Path) -> Callable[[], object]:
+    app = prepared_app(root, "--no-hash-cache")
+
+    def run():
+        report_dir = Path(tempfile.mkdtemp(prefix="b2-bench-report-"))
+        os.chdir(report_dir)
+        try:
+            # Events are streamed from the collector, so every run needs a fresh query
+            app.collect_event_log_entries().compose_report()
+        finally:
+            os.chdir(root)
+            shutil.rmtree(report_dir, ignore_errors=True)
+    return run
+
+
+def bench_compose_report_delta(root: Path) -> Callable[[], object]:
+    base_dir = Path(tempfile.mkdtemp(prefix="b2-bench-base-"))
+    atexit.register(shutil.rmtree, base_dir, ignore_errors=True)
+    app = prepared_app(root, "--no-hash-cache")
+    os.chdir(base_dir)
+    base = app.collect_event_log_entries().compose_report().get_report_path()
+    os.chdir(root)
+    app = prepared_app(root, "--no-hash-cache", "--since", str(base))
+
+    def run():
+        report_dir = Path(tempfile.mkdtemp(prefix="b2-bench-report-"))
+        os.chdir(report_dir)
+        try:
+            app.collect_event_log_entries().compose_report()
+            assert app.get_report_path().stat().st_size < base.stat().st_size / 10, "Delta report is not smaller than the base report"
+        finally:
+            os.chdir(root)
+            shutil.rmtree(report_dir, ignore_errors=True)
+    return run
+
+
+def bench_compose_report_volumes(root: Path) -> Callable[[], object]:
+    from ReportVolumes import ReportVolumes
+    app = prepared_app(root, "--no-hash-cache", "--max-volume-size", "4M")
+
+    def run():
+        report_dir = Path(tempfile.mkdtemp(prefix="b2-bench-report-"))
+        os.chdir(report_dir)
+        try:
+            parts = ReportVolumes.parts_of(app.collect_event_log_entries().compose_report().get_report_path())
+            assert all(part.stat().st_size <= 4 * 1024 * 1024 for part in parts), "A report part is larger than the volume size"
+        finally:
+            os.chdir(root)
+            shutil.rmtree(report_dir, ignore_errors=True)
+    return run
+
+
+def bench_index_reports(root: Path) -> Callable[[], object]:
+    from ReportIndex import ReportIndex
+    app = prepared_app(root, "--no-hash-cache")
+    inbox = Path(tempfile.mkdtemp(prefix="b2-bench-inbox-"))
+    atexit.register(shutil.rmtree, inbox, ignore_errors=True)
+    os.chdir(inbox)
+    app.compose_report()
+    os.chdir(root)
+    # Support inboxes hold hundreds of reports, links keep the copies cheap
+    report = next(inbox.glob("b2-report-*.zip"))
+    for i in range(200):
+        os.link(report, inbox / f"b2-report-{i:04d}.zip")
+    # Reports made on Windows before every hash diff list used manifest keys have backslashes in extra and modified
+    with zipfile.ZipFile(report) as source, zipfile.ZipFile(inbox / "b2-report-windows.zip", "w") as windows:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == "general.json":
+                general = json.loads(data)
+                general["file_hashes_diff"] = {"revision": 4516, "summary": {}, "missing": ["bin/missing.dll"], "extra": [{"path": "bin\\extra.dll"}], "modified": [{"path": "bin\\modified.dll"}]}
+                data = json.dumps(general).encode("utf-8")
+            windows.writestr(info, data)
+
+    def run():
+        db_file = inbox / "index.sqlite"
+        for stale in inbox.glob("index.sqlite*"):
+            stale.unlink()
+        with ReportIndex(db_file) as index:
+            assert index.add([inbox])["added"] == 202, "Not every report was indexed"
+            assert index.add([inbox])["unchanged"] == 202, "Unchanged reports were indexed again"
+            assert len(index.find(fault_module="T6ZM.EXE", limit=1000)) == 202, "Fault module query does not match the fixture events"
+            for kind in ("missing", "extra", "modified"):
+                assert len(index.find(deviation=f"bin\\{kind}.dll", deviation_kind=kind)) == 1, f"Deviation query does not match the {kind} path"
+    return run
+
+
+def bench_batch_hash_cache(root: Path) -> Callable[[], object]:
+    from BatchRunner import BatchRunner
+    from HashCache import HashCache
+    # Hardlinked copies, every root is hashed on its own but the copies cost no disk space
+    batch_dir = Path(tempfile.mkdtemp(prefix="b2-bench-batch-"))
+    atexit.register(shutil.rmtree, batch_dir, ignore_errors=True)
+    roots = [str(shutil.copytree(root, batch_dir / f"Plutonium-{i}", copy_function=os.link)) for i in range(3)]
+
+    def run():
+        cache_file = HashCache.default_location()
+        cache_file.unlink(missing_ok=True)
+        sys.argv = ["bench", "--collectors", "-hardware,-events,-power"]
+        results = BatchRunner("bench", roots, len(roots), batch_dir / "reports").run()
+        assert all(result.status == "ok" for result in results), f"Batch reports failed: {[result.error for result in results]}"
+        # Workers save the shared cache concurrently, none of them may drop the roots saved by the others
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))["roots"]
+        assert sorted(cached) == sorted(roots), f"Hash cache lost roots, it holds {sorted(cached)}"
+        shutil.rmtree(batch_dir / "reports")
+    return run
+
+
+BENCHMARKS: dict[str, Callable[[Path], Callable[[], object]]] = {
+    "dir_iterator": bench_dir_iterator,
+    "get_hashes": bench_get_hashes,
+    "collect_file_hashes_cold": bench_collect_file_hashes_cold,
+    "collect_file_hashes_warm": bench_collect_file_hashes_warm,
+    "parse_powercfg": bench_parse_powercfg,
+    "hardware_probes": bench_hardware_probes,
+    "window_logs": bench_window_logs,
+    "summarize_crashdumps": bench_summarize_crashdumps,
+    "select_crashdump": bench_select_crashdump,
+    "compose_report": bench_compose_report,
+    "compose_report_delta": bench_compose_report_delta,
+    "compose_report_volumes": bench_compose_report_volumes,
+    "index_reports": bench_index_reports,
+    "batch_hash_cache": bench_batch_hash_cache,
+}
+
+
+def measure(factory: Callable[[Path], Callable[[], object]], root: Path, repeat: int) -> list[float]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = factory(root)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reporter hot path benchmarks")
+    parser.add_argument("--preset", choices=PRESETS, default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, help="run only the listed benchmarks")
+    parser.add_argument("--output", type=Path, help="write results as json")
+    parser.add_argument("--baseline", type=Path, help="compare against results written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--keep-tree", type=Path, help="generate the tree at this path (reused if it exists) and keep it")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="b2-bench-"))
+    root = args.keep_tree.resolve() if args.keep_tree else workdir / "Plutonium"
+    os.environ["localappdata"] = str(workdir / "localappdata")
+    builtins.input = lambda *_: "1"
+    cwd = Path.cwd()
+
+    thresholds: dict[str, float] = json.loads((BENCHMARKS_DIR / "thresholds.json").read_text()).get(args.preset, {})
+    baseline: dict[str, dict] = {}
+    if args.baseline:
+        baseline_data = json.loads(args.baseline.read_text())
+        assert baseline_data["preset"] == args.preset, f"Baseline was measured with preset '{baseline_data['preset']}', not '{args.preset}'"
+        baseline = baseline_data["results"]
+
+    try:
+        if not root.exists():
+            start = time.perf_counter()
+            SyntheticTree(root, PRESETS[args.preset]).generate()
+            print(f"Generated '{args.preset}' tree at {root} in {time.perf_counter() - start:.2f}s")
+
+        results: dict[str, dict] = {}
+        failures: list[str] = []
+        print(f"{'benchmark':<28}{'min':>10}{'median':>10}{'threshold':>12}{'baseline':>10}")
+        for name in args.only or BENCHMARKS:
+            timings = measure(BENCHMARKS[name], root, args.repeat)
+            result = {"min": min(timings), "median": statistics.median(timings), "runs": timings}
+            results[name] = result
+
+            threshold = thresholds.get(name)
+            base = baseline.get(name, {}).get("median")
+            if threshold is not None and result["median"] > threshold:
+                failures.append(f"{name}: median {result['median']:.4f}s exceeds threshold {threshold:.4f}s")
+            if base is not None and result["median"] > base * (1 + args.tolerance):
+                failures.append(f"{name}: median {result['median']:.4f}s is more than {args.tolerance:.0%} slower than baseline {base:.4f}s")
+
+            print(f"{name:<28}{result['min']:>10.4f}{result['median']:>10.4f}"
+                  f"{(f'{threshold:.4f}' if threshold is not None else '-'):>12}{(f'{base:.4f}' if base is not None else '-'):>10}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps({"preset": args.preset, "python": sys.version, "results": results}, indent=4))
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
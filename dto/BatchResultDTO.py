@@ -0,0 +1,12 @@
+import dataclasses
+from typing import Optional
+
+@dataclasses.dataclass(frozen=True)
+class BatchResultDTO:
+    root: str
+    status: str
+    error: Optional[str]
+    wall_s: float
+    stages_ms: dict[str, float]
+    stage_errors: dict[str, str]
+    report_path: Optional[str]
@@ -0,0 +1,8 @@
+import dataclasses
+from typing import Optional
+
+@dataclasses.dataclass(frozen=True)
+class CompressionPlanDTO:
+    compress_type: int
+    compresslevel: Optional[int]
+    ratio: Optional[float] = None
@@ -0,0 +1,11 @@
+import dataclasses
+from typing import Optional
+
+@dataclasses.dataclass(frozen=True)
+class EventIndexDTO:
+    event_id: Optional[int]
+    record_id: Optional[int]
+    time_created: Optional[str]
+    provider: Optional[str]
+    offset: int
+    length: int
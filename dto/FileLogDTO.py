@@ -1,8 +1,12 @@
 import dataclasses
 from pathlib import Path
+from typing import Optional
 from PlutoniumFileType import PlutoniumFileType
 
 @dataclasses.dataclass(frozen=True)
 class FileLogDTO:
     path: Path
     type: PlutoniumFileType
+    # Byte range of the file that goes into the report, the whole file by default
+    start: int = 0
+    end: Optional[int] = None
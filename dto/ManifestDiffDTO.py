@@ -0,0 +1,10 @@
+import dataclasses
+from typing import Optional
+
+@dataclasses.dataclass(frozen=True)
+class ManifestDiffDTO:
+    revision: Optional[int]
+    summary: dict[str, int]
+    missing: list[str]
+    extra: list[dict]
+    modified: list[dict]
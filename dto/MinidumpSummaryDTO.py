@@ -0,0 +1,13 @@
+import dataclasses
+from typing import Optional
+
+@dataclasses.dataclass(frozen=True)
+class MinidumpSummaryDTO:
+    file: str
+    size: int
+    created_at: Optional[str]
+    exception: Optional[dict]
+    faulting_module: Optional[str]
+    system: Optional[dict]
+    threads: list[dict]
+    modules: list[dict]
@@ -0,0 +1,88 @@
+"""
+Support side companion of the reporter, indexes received `b2-report-*.zip` archives into SQLite and searches them.
+Archives are read in place, nothing is extracted, and only new or changed archives are read on every `add`.
+
+    python indexer.py [--db b2-reports.sqlite] add PATH [PATH ...]
+    python indexer.py [--db b2-reports.sqlite] find [--revision N] [--game t4|t5|t6] [--module NAME] [--gpu TEXT]
+                                                   [--missing PATH | --modified PATH | --extra PATH]
+                                                   [--crashed-after DATE] [--crashed-before DATE] [--limit N] [--json]
+    python indexer.py [--db b2-reports.sqlite] stats
+"""
+from pathlib import Path
+from ReportIndex import ReportIndex
+import sys, json, time, argparse
+
+
+def add(index: ReportIndex, args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    stats = index.add(args.paths)
+    print(f"Indexed {stats['added']} new and {stats['updated']} changed reports, {stats['unchanged']} unchanged, "
+          f"{stats['failed']} failed in {time.perf_counter() - start:.2f}s")
+
+
+def find(index: ReportIndex, args: argparse.Namespace) -> None:
+    deviation, kind = next(((getattr(args, kind), kind) for kind in ("missing", "modified", "extra") if getattr(args, kind)), (None, None))
+    start = time.perf_counter()
+    rows = index.find(
+        revision=args.revision,
+        game=args.game,
+        fault_module=args.module,
+        deviation=deviation,
+        deviation_kind=kind,
+        crashed_after=args.crashed_after,
+        crashed_before=args.crashed_before,
+        gpu=args.gpu,
+        limit=args.limit,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps([dict(row) for row in rows], indent=4))
+        return
+    print(f"{'created':<20}{'game':<6}{'revision':>9}  {'crashed at':<20}{'deviations':>11}  {'fault modules':<28}path")
+    for row in rows:
+        deviations = "-" if row["missing_files"] is None else str(row["missing_files"] + row["extra_files"] + row["modified_files"])
+        print(f"{row['created_at'] or '-':<20}{row['game'] or '-':<6}{row['revision'] or '-':>9}  {row['crashed_at'] or '-':<20}"
+              f"{deviations:>11}  {(row['fault_modules'] or '-')[:26]:<28}{row['path']}")
+    print(f"\t{len(rows)} reports in {elapsed_ms:.1f}ms")
+
+
+def stats(index: ReportIndex, args: argparse.Namespace) -> None:
+    print(json.dumps(index.stats(), indent=4))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index and search B2 Plutonium Reporter archives")
+    parser.add_argument("--db", type=Path, default=ReportIndex.default_location(), help="index database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="index report archives, directories are searched recursively")
+    add_parser.add_argument("paths", type=Path, nargs="+")
+    add_parser.set_defaults(run=add)
+
+    find_parser = commands.add_parser("find", help="list reports matching every given filter")
+    find_parser.add_argument("--revision", type=int)
+    find_parser.add_argument("--game", choices=("t4", "t5", "t6"))
+    find_parser.add_argument("--module", help="faulting module from Application Error events, eg. t6zm.exe")
+    find_parser.add_argument("--gpu", help="part of the GPU name")
+    deviations = find_parser.add_mutually_exclusive_group()
+    deviations.add_argument("--missing", help="file missing against the release manifest, relative to the Plutonium root")
+    deviations.add_argument("--modified", help="file modified against the release manifest")
+    deviations.add_argument("--extra", help="file not in the release manifest")
+    find_parser.add_argument("--crashed-after", help="crashdump taken at or after, eg. 2026-10-01")
+    find_parser.add_argument("--crashed-before", help="crashdump taken before, eg. 2026-10-02")
+    find_parser.add_argument("--limit", type=int, default=100)
+    find_parser.add_argument("--json", action="store_true")
+    find_parser.set_defaults(run=find)
+
+    stats_parser = commands.add_parser("stats", help="summary of the indexed reports")
+    stats_parser.set_defaults(run=stats)
+
+    args = parser.parse_args()
+    with ReportIndex(args.db) as index:
+        args.run(index, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
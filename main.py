@@ -1,21 +1,54 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import os, sys, cProfile, multiprocessing
+import datetime as dt
+from pathlib import Path
 from App import App
+from BatchRunner import BatchRunner
+from Tracer import Tracer
 
 VERSION = "1.0"
 
-def main():
+def main() -> int:
     print(f"B2 PLUTONIUM REPORTER V{VERSION}")
+    tracer = Tracer.get()
+
+    roots = App.get_runtime_args("--root")
+    if len(roots) > 1:
+        workers = int(App.get_runtime_arg("--batch-workers", str(os.cpu_count() or 1)))
+        results = BatchRunner(VERSION, roots, workers, Path(App.get_runtime_arg("--output-dir", str(Path.cwd())))).run()
+        return 1 if any(result.status == "failed" for result in results) else 0
+
+    # Same as BatchRunner.run_root, a failed report is reported instead of ending in a traceback
+    stage = "path"
+    try:
+        with tracer.span(stage, "stage"):
+            app = App(VERSION, STARTED_AT).set_plutonium_path()
+
+        stage = "report"
+        # cProfile only sees the thread it runs on, so profiling forces stages onto the main thread
+        app.build_report(sequential="--sequential" in sys.argv or "--profile" in sys.argv)
+    except Exception as exc:
+        print(f"\tReport failed in the {stage} stage: {type(exc).__name__}: {exc}")
+        return 1
 
-    (App(VERSION)
-        .set_plutonium_path()
-        .collect_relevant_logs()
-        .collect_configs()
-        .collect_file_hashes()
-        .collect_hardware_data()
-        .collect_event_log_entries()
-        .collect_power_settings()
-        .compose_report()
-    )
-    input("Press ENTER to finish, send the zip file to the person handling your issue")
+    if "--trace" in sys.argv:
+        trace_path = tracer.write_chrome_trace(Path.cwd() / f"b2-trace-{int(dt.datetime.now().timestamp())}.json")
+        print(f"\tWrote trace events to {trace_path}")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    # Batch workers are spawned processes, a frozen executable has to dispatch them before running main
+    multiprocessing.freeze_support()
+    if "--profile" in sys.argv:
+        profile_path = Path.cwd() / f"b2-profile-{int(dt.datetime.now().timestamp())}.prof"
+        profiler = cProfile.Profile()
+        exit_code = profiler.runcall(main)
+        profiler.dump_stats(profile_path)
+        print(f"\tWrote profile to {profile_path}")
+    else:
+        exit_code = main()
+    if "--headless" not in sys.argv and len(App.get_runtime_args("--root")) <= 1:
+        input("Press ENTER to finish, send the zip file to the person handling your issue" if exit_code == 0 else "Press ENTER to close")
+    sys.exit(exit_code)